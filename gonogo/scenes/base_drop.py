@@ -1,5 +1,4 @@
 from time import sleep
-from timeit import default_timer
 from datetime import datetime
 import numpy as np
 #
@@ -13,6 +12,9 @@ from mglg.graphics.particle2d import ParticleBurst2D
 from mglg.graphics.shaders import (FlatShader, ImageShader, ParticleShader)
 from mglg.graphics.shape2d import Circle, Square
 from gonogo.utils import rush
+from gonogo.utils.baked_player import BakedPlayer
+from gonogo.utils.sample_buffer import SampleBuffer
+from gonogo.utils.trace_events import trace_device, tracer
 from gonogo.visuals.countdown import Countdown
 
 # sound
@@ -22,7 +24,6 @@ from gonogo.sound import Sound
 from toon.anim import Player, Track
 from toon.anim.easing import exponential_in, smoothstep
 from toon.anim.interpolators import select
-from toon.input import stack
 
 # base for all vertically-dropping variations
 
@@ -76,7 +77,7 @@ class BaseDrop(Block):
         # just need to remember to reset() right before playing
         self.particle_burst = ParticleBurst2D(win.context, particle_shader,
                                               scale=(0.025, 0.025),
-                                              num_particles=1e4)
+                                              num_particles=1e4, clock=win.clock)
         self.particle_burst.visible = False
         self.particle_burst.position = self.ball.position
         self.particles = DrawableGroup([self.particle_burst])
@@ -98,12 +99,16 @@ class BaseDrop(Block):
         pop_path = resource_filename('gonogo', 'resources/sound/blop.wav')
         self.pop_sound = Sound.from_file(pop_path)
 
+        # device data for the current trial (sized in setup_trial)
+        self.samples = SampleBuffer(getattr(device.device, 'sampling_frequency', None))
+
     def setup_trial(self):
         # set up *all* animations, data path, ...
 
         # get current trial settings & increment
         next_settings = self.block_handler.next()
-        self.trial_player = Player()
+        # precomputed per frame (see BakedPlayer), baked in run()
+        self.trial_player = BakedPlayer(self.win.frame_period)
 
         # set up ball motion-- unpack relevant values
         y_ball = next_settings['y_ball']
@@ -165,10 +170,15 @@ class BaseDrop(Block):
         img_scal = [(0, orig_scale/10), (t_feed*3/4, orig_scale)]
         img_alpha = Track(img_alpha, easing=smoothstep)
         img_scal = Track(img_scal, easing=smoothstep)
-        self.feedback_anim = Player()
+        self.feedback_anim = BakedPlayer(self.win.frame_period)
         self.feedback_anim.add(img_alpha, 'alpha', [self.check, self.x])
         self.feedback_anim.add(img_scal, 'xy', [self.check.scale, self.x.scale])
 
+        # make room for the whole trial's worth of device data now,
+        # so the trial loops never allocate
+        t_trial = t_waiting + t_max + t_overshoot + t_feed
+        self.samples.reserve(t_trial, self.win.frame_period)
+
         return next_settings  # pass along
 
     def draw(self):
@@ -181,14 +191,31 @@ class BaseDrop(Block):
     def run(self):
         # take datetime to use across this block
         self.datetime = datetime.now().strftime('%y%m%d_%H%M%S')
-        with self.device:  # use context manager version
-            while not self.block_handler.should_finish():
-                self.setup_trial()
-                # if first trial, run fade-in + countdown
-                if self.block_handler.counter == 1:
-                    self.fade_in()
-                self.run_trial()
-        self.fade_out()
+        profiler = self.win.profiler
+        first_frame = profiler.frame if profiler is not None else None
+        tracer.clear()  # one timeline per block
+        try:
+            with self.device:  # use context manager version
+                while not self.block_handler.should_finish():
+                    with tracer.span('setup_trial'):
+                        self.setup_trial()
+                        # subclasses add their tracks after BaseDrop's, so bake here
+                        self.trial_player.bake()
+                        self.feedback_anim.bake()
+                    # if first trial, run fade-in + countdown
+                    if self.block_handler.counter == 1:
+                        with tracer.span('fade_in'):
+                            self.fade_in()
+                    with tracer.span('trial'):
+                        self.run_trial()
+        finally:
+            # drain the background writer, even if something went wrong
+            self.close_data()
+            if profiler is not None:
+                self.write_frame_timing(profiler.histograms(first_frame))
+        with tracer.span('fade_out'):
+            self.fade_out()
+        self.write_trace()
 
     def run_trial(self):
         rush(True)
@@ -199,6 +226,8 @@ class BaseDrop(Block):
         current_settings = self.block_handler.previous_trials[-1]
         frame_period_tol = win.frame_period * 1.25
         trial_player = self.trial_player
+        samples = self.samples
+        samples.reset()
         # use device clock
         trial_player.reset()  # kick everything to t=0
         self.draw()
@@ -206,47 +235,64 @@ class BaseDrop(Block):
         trial_player.start(win.current_time)
         t_start = win.current_time
         device.clear()  # clear any pending data
+        tracer.begin('run_trial')
         response = False
-        data_list = []
         dropped_frames = []
-        while trial_player.is_playing:
-            # read data
-            #t0 = default_timer()
-            data = device.read()
-            data_list.append(data.copy())
+        # no-ops unless profiling (see ExpWindow.section)
+        section_read = win.section('device_read')
+        section_advance = win.section('advance')
+        section_draw = win.section('draw')
+
+        def read_device():
+            # read data as late as possible, right before the swap
+            nonlocal response
+            with section_read:
+                data = device.read()
+            samples.extend(data)  # copy into preallocated storage
             if data.any():
+                trace_device(data)
                 if is_custom_device:
                     response = (data.buttons > 0).any()
                 else:
                     response = any(data.press)
-                if response:
-                    break
-            # advance visuals to estimated next frame period
-            trial_player.advance(win.current_time + win.frame_period)
-            self.draw()
-            #t1 = default_timer()
-            win.flip()
-            #print(t1 - t0)
-            if win.dt > frame_period_tol:
-                dropped_frames.append([win.current_time - t_start, win.dt])
+
+        win.add_late_latch(read_device)
+        try:
+            while trial_player.is_playing and not response:
+                # advance visuals to the predicted time of the next flip
+                with section_advance:
+                    trial_player.advance(win.next_flip)
+                with section_draw:
+                    self.draw()
+                win.flip()
+                if win.dt > frame_period_tol:
+                    dropped_frames.append([win.current_time - t_start, win.dt])
+                    tracer.instant('dropped_frame', 'flips', win.current_time, 1000 * win.dt)
+        finally:
+            win.remove_late_latch(read_device)
+            tracer.end('run_trial')
 
         rush(False)
-        data_stack = stack(data_list)
-        return data_stack, dropped_frames
+        # view of the data so far (feedback_loop keeps appending after this)
+        return samples.view(), dropped_frames
 
     def feedback_loop(self):
         win = self.win
         device = self.device
         trial_player = self.trial_player
-        data_list = []
+        samples = self.samples
+        tracer.begin('feedback_loop')
         self.feedback_anim.start(win.current_time)
         while self.feedback_anim.is_playing or self.trial_player.is_playing:
             data = device.read()
-            data_list.append(data.copy())
+            samples.extend(data)
+            if data.any():
+                trace_device(data)
             self.feedback_anim.advance(win.current_time + win.frame_period)
             trial_player.advance(win.current_time + win.frame_period)
             self.draw()
             win.flip()
+        tracer.end('feedback_loop')
 
         # reset after feedback
         self.check.visible = False
@@ -256,7 +302,8 @@ class BaseDrop(Block):
         self.ball.visible = True
         self.ball2.visible = False
 
-        return stack(data_list)
+        # all data from the trial (movement + feedback)
+        return samples.view()
 
     def fade_which(self, track, sort):
         fade_track = track
@@ -264,19 +311,20 @@ class BaseDrop(Block):
         fade_player = Player()
         fade_player.add(fade_track, 'a', self.fade.fill_color)
 
-        fade_player.start(default_timer())
+        fade_player.start(self.win.clock())
         while fade_player.is_playing:
-            fade_player.advance(default_timer())
+            fade_player.advance(self.win.clock())
             self.draw()
             self.fade.draw(self.win.cam)
             self.win.flip()
         self.fade.visible = False
         if sort == 'in':
             self.countdown.start()
-            while self.countdown.player.is_playing:
-                self.draw()
-                self.countdown.draw()
-                self.win.flip()
+            with tracer.span('countdown'):
+                while self.countdown.player.is_playing:
+                    self.draw()
+                    self.countdown.draw()
+                    self.win.flip()
 
     def fade_in(self):
         self.fade_which(Track([(0, 1.0), (1, 0)]), 'in')
@@ -1,16 +1,16 @@
 from abc import ABCMeta, abstractmethod
 from math import cos, sin
-from timeit import default_timer
 
 import imgui
-from imgui import WINDOW_NO_COLLAPSE, WINDOW_NO_MOVE, WINDOW_NO_RESIZE, WINDOW_NO_TITLE_BAR
+import numpy as np
+from imgui import WINDOW_NO_COLLAPSE, WINDOW_NO_MOVE, WINDOW_NO_RESIZE
 from pkg_resources import resource_filename
 
 from gonogo.visuals.imgui_abstractions import ProgrammablePygletRenderer
 from gonogo.visuals.render_surface import RenderSurface2D
 from mglg.graphics.shaders import FlatShader, ImageShader, TextShader
 from mglg.graphics.shape2d import Square
-from mglg.graphics.text2d import FontManager, Text2D
+from mglg.graphics.text2d import DynamicText2D, FontManager, Text2D
 from gonogo.visuals.mock_buttons import MockButtons
 
 
@@ -72,6 +72,21 @@ class BaseInstruction(metaclass=ABCMeta):
         self.start_text_bg = Square(win.context, flat, is_outlined=False,
                                     fill_color=(0.1, 0.1, 0.1, 0.8),
                                     scale=(2, 0.06), position=(0, 0.1))
+        # block counter, top left, on a 180x50px panel 100px from the corner
+        # (same place, size & colors as the imgui window it replaced)
+        rnd = {'en': 'Round', 'es': 'La ronda'}
+        self.round_label = rnd[default_lang]
+        self.round_bg = Square(win.context, flat, is_outlined=False,
+                               fill_color=(0.09, 0.09, 0.09, 0.7),
+                               scale=(180/win.height, 50/win.height),
+                               position=(190/win.height - win.width/(2*win.height),
+                                         0.5 - 125/win.height))
+        self.render_round = DynamicText2D(win.context, text_shader, win.width,
+                                          win.height, '', instr_font, anchor_x='left',
+                                          color=(0.9, 0.9, 0.9, 1),
+                                          scale=(30/win.height, 30/win.height),
+                                          position=(108/win.height - win.width/(2*win.height),
+                                                    0.5 - 125/win.height))
 
         # imgui stuff
         self.imgui_renderer = ProgrammablePygletRenderer(win._win)
@@ -81,27 +96,34 @@ class BaseInstruction(metaclass=ABCMeta):
         self.flags = WINDOW_NO_RESIZE | WINDOW_NO_MOVE | WINDOW_NO_COLLAPSE
         self.imgui_dims = int(4/3*win.height), int(1/4 * win.height)
         self.imgui_pos = win.width//7, int((win.height/2) + self.imgui_dims[1] * 4/5)
-        self.t0 = default_timer()
+        self.t0 = win.clock()
         self.can_finish = False
         self.fade_in = True
         self.fade_out = False
         self.num = number
         self.tot = total
+        self._preview_state = None  # see values_changed
+        self.render_round.text = '%s %s/%s' % (self.round_label, number, total)
 
     def draw(self, data):
         # render to texture
-        time = default_timer() - self.t0
-        with self.preview_surface:
-            self.preview_draw(self.preview_surface.cam)
-            # start flashing message & allow input
-            if time > 3.14:
-                self.can_finish = True
-                self.render_start.color.a = sin(time*3)/2 + 0.85
-                self.start_text_bg.draw(self.preview_surface.cam)
-                self.render_start.draw(self.preview_surface.cam)
-            self.mock_keys.draw(self.preview_surface.cam)
+        time = self.win.clock() - self.t0
+        # start flashing message & allow input
+        flashing = time > 3.14
+        changed = self.preview_changed()  # (always called, as it may advance animations)
+        if self.preview_surface.dirty or flashing or changed:
+            with self.preview_surface:
+                self.preview_draw(self.preview_surface.cam)
+                if flashing:
+                    self.can_finish = True
+                    self.render_start.color.a = sin(time*3)/2 + 0.85
+                    self.start_text_bg.draw(self.preview_surface.cam)
+                    self.render_start.draw(self.preview_surface.cam)
+                self.mock_keys.draw(self.preview_surface.cam)
         self.preview_surface.draw(self.win.cam)
         self.render_title.draw(self.win.cam)
+        self.round_bg.draw(self.win.cam)
+        self.render_round.draw(self.win.cam)
 
         # imgui window
         imgui.new_frame()
@@ -114,12 +136,6 @@ class BaseInstruction(metaclass=ABCMeta):
         imgui.text(self.it2)
         imgui.pop_text_wrap_pos()
         imgui.end()
-        imgui.set_next_window_position(100, 100)
-        imgui.set_next_window_size(180, 50)
-        imgui.begin('##blockcount', flags=self.flags | WINDOW_NO_TITLE_BAR)
-        rnd = {'en': 'Round', 'es': 'La ronda'}
-        imgui.text('%s %s/%s' % (rnd[self.default_lang], self.num, self.tot))
-        imgui.end()
         imgui.pop_font()
         imgui.render()
         self.imgui_renderer.render(imgui.get_draw_data())
@@ -141,8 +157,22 @@ class BaseInstruction(metaclass=ABCMeta):
     def preview_draw(self, cam):
         pass
 
+    def preview_changed(self):
+        # whether the preview needs re-rendering this frame (otherwise, the last
+        # render is re-used). Called once per frame, before preview_draw, so
+        # animations can be advanced here (see values_changed). Previews that
+        # don't say what changed are re-rendered every frame
+        return True
+
+    def values_changed(self, *vectors):
+        # whether `vectors` hold anything different from the last call
+        state = np.concatenate(vectors)
+        changed = self._preview_state is None or not np.array_equal(state, self._preview_state)
+        self._preview_state = state
+        return changed
+
     def run(self):
-        self.t0 = default_timer()
+        self.t0 = self.win.clock()
         done = False
         kbd = self.device
         win = self.win
@@ -159,6 +189,8 @@ class BaseInstruction(metaclass=ABCMeta):
                     data = None
                 done = self.draw(any_pressed)
                 win.flip()
+        # let the next screen have the framebuffer
+        self.preview_surface.release()
 
 
 class Test(BaseInstruction):
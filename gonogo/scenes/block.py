@@ -1,9 +1,10 @@
-import csv
 import json
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
 import os
 from gonogo.utils import NumpyEncoder
+from gonogo.utils.data_writer import DataWriter
+from gonogo.utils.trace_events import tracer
 
 class Block(metaclass=ABCMeta):
     @property
@@ -37,41 +38,40 @@ class Block(metaclass=ABCMeta):
                                        'block%s' % block_handler.text_dict['block_key'])
 
         os.makedirs(self.block_path, exist_ok=True)
-        os.makedirs(os.path.join(self.block_path, 'traces'), exist_ok=True)
-        os.makedirs(os.path.join(self.block_path, 'dropped_frames'), exist_ok=True)
+        self.writer = None  # started on the first write
         # dump original block settings
         sets_path = os.path.join(self.block_path, 'block_settings.json')
         with open(sets_path, 'w') as f:
             json.dump(block_handler.text_dict, f, indent=2, cls=NumpyEncoder)
 
     def write_data(self, summary, long_data, ref_time, dropped_frames):
-        fieldnames = summary.keys()
-        if self._trial_counter < 1:
+        # hand off to the background writer, which owns all files for this block
+        # (summary csv, traces & dropped frames; see gonogo.utils.data_writer)
+        if self.writer is None:
             sname = 'summary_%s_%s_%s.csv' % (self.user_settings['id'],
                                               self.block_handler.name,
                                               self.datetime)
             self.block_summary_name = os.path.join(self.block_path, sname)
-            with open(self.block_summary_name, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames)
-                writer.writeheader()
-        with open(self.block_summary_name, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writerow(summary)
+            self.writer = DataWriter(self.block_path, self.block_summary_name)
+        # long_data may be a view of a reused buffer, so copy before handing it off
+        with tracer.span('write_data'):
+            self.writer.write(self._trial_counter, summary, long_data.copy(), ref_time, dropped_frames)
+        self._trial_counter += 1
 
-        # subtract off ref_time so time is relative to trial start
-        trace_path = os.path.join(self.block_path, 'traces', 'traces_trial%i.json' % self._trial_counter)
-        out_dct = {f: {'time': None, 'data': None} for f in long_data._fields}
-        for field in long_data._fields:
-            # extract particular data
-            dat = getattr(long_data, field)
-            if dat is not None:
-                out_dct[field]['time'] = (dat.time - ref_time).tolist()
-                out_dct[field]['data'] = dat.tolist()
-        with open(trace_path, 'w') as f:
-            json.dump(out_dct, f)
+    def write_frame_timing(self, histograms):
+        # per-block CPU/GPU timing (only when profiling, see mglg.util.profiler),
+        # next to the dropped frames
+        histograms['frame_period'] = self.win.frame_period
+        with open(os.path.join(self.block_path, 'frame_timing.json'), 'w') as f:
+            json.dump(histograms, f, indent=2, cls=NumpyEncoder)
 
-        # write any dropped frames
-        dropped_path = os.path.join(self.block_path, 'dropped_frames', 'dropped_frames_trial%i.json' % self._trial_counter)
-        with open(dropped_path, 'w') as f:
-            json.dump(dropped_frames, f, indent=2)
-        self._trial_counter += 1
+    def write_trace(self):
+        # timeline of the block (see gonogo.utils.trace_events)
+        tracer.export(os.path.join(self.block_path, 'trace.json'),
+                      block=self.block_handler.name, datetime=self.datetime)
+
+    def close_data(self):
+        # wait for pending writes to land on disk
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
@@ -1,5 +1,4 @@
 from toon.anim import Track, Player
-from timeit import default_timer
 from pkg_resources import resource_filename
 from mglg.graphics.shaders import ParticleShader, TextShader
 from mglg.graphics.text2d import Text2D, FontManager
@@ -14,7 +13,7 @@ class Done(object):
 
         self.particle_burst = ParticleBurst2D(win.context, particle_shader,
                                         scale=(0.05, 0.05), position=(0, 0.1),
-                                        num_particles=1e4)
+                                        num_particles=1e4, clock=win.clock)
 
         title_path = resource_filename('gonogo', 'resources/fonts/Baloo-Regular.ttf')
         title_font = FontManager.get(title_path, size=64)
@@ -31,10 +30,10 @@ class Done(object):
     def run(self):
         # fade in, fade out
         self.particle_burst.reset()
-        self.player.start(default_timer())
+        self.player.start(self.win.clock())
         
         while self.player.is_playing:
-            self.player.advance(default_timer())
+            self.player.advance(self.win.clock())
             self.particle_burst.draw(self.win.cam)
             self.render_title.draw(self.win.cam)
             self.win.flip()
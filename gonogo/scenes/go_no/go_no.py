@@ -7,7 +7,6 @@ from mglg.graphics.shape2d import Square
 # animation
 from toon.anim import Player, Track
 from toon.anim.interpolators import select
-from toon.input import stack
 
 
 class GoNo(BaseDrop):
@@ -68,7 +67,7 @@ class GoNo(BaseDrop):
             lb = current_settings['t_max'] - current_settings['timing_tol']
             ub = current_settings['t_max'] + current_settings['timing_tol']
             good_timing = press_time >= lb and press_time <= ub
-            trial_player.advance(t_start + press_time + t_delay)
+            trial_player.seek(t_start + press_time + t_delay)
             correct_choice = False
             if is_go:
                 correct_choice = True
@@ -102,8 +101,7 @@ class GoNo(BaseDrop):
             self.good_sound.play()
         else:
             self.bad_sound.play()
-        feedback_data = self.feedback_loop()
-        long_data = stack([data_stack, feedback_data])
+        long_data = self.feedback_loop()  # includes data_stack
         # TODO: subtract off t_start from the long_data timestamp?
         summary_data = current_settings.copy()
         summary_data['choice'] = press_choice
@@ -1,4 +1,3 @@
-from timeit import default_timer
 from math import inf
 from toon.anim import Track, Player
 from toon.anim.interpolators import select
@@ -79,9 +78,14 @@ class GoNoInstr(BaseInstruction):
 
         left_green = Track(key_green, easing=smootherstep)
         self.player.add(left_green, 'g', self.mock_keys.left_key.fill_color)
-        self.player.start(default_timer())
+        self.player.start(win.clock())
+
+    def preview_changed(self):
+        # only re-render when the animation actually moved something
+        self.player.advance(self.win.clock())
+        return self.values_changed(self.ball.position, self.ball.scale, self.ball.fill_color,
+                                   self.mock_keys.left_key.fill_color)
 
     def preview_draw(self, cam):
         # draw the task-specific anim here
-        self.player.advance(default_timer())
         self.dg.draw(cam)
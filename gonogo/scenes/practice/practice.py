@@ -8,7 +8,6 @@ from mglg.graphics.shape2d import Square
 # animation
 from toon.anim import Player, Track
 from toon.anim.interpolators import select
-from toon.input import stack
 
 
 class Practice(BaseDrop):
@@ -67,7 +66,7 @@ class Practice(BaseDrop):
             lb = current_settings['t_max'] - current_settings['timing_tol']
             ub = current_settings['t_max'] + current_settings['timing_tol']
             good_timing = press_time >= lb and press_time <= ub
-            trial_player.advance(t_start + press_time + t_delay)
+            trial_player.seek(t_start + press_time + t_delay)
             if good_timing:
                 self.ball.visible = False
                 self.particle_burst.visible = True
@@ -92,8 +91,7 @@ class Practice(BaseDrop):
         else:
             self.bad_sound.play()
 
-        feedback_data = self.feedback_loop()
-        long_data = stack([data_stack, feedback_data])
+        long_data = self.feedback_loop()  # includes data_stack
         summary_data = current_settings.copy()
         summary_data['choice'] = press_choice
         summary_data['t_choice'] = press_time
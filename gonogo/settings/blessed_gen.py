@@ -6,11 +6,14 @@ from numpy.random import RandomState
 
 
 class Blessed(object):
+    # all generators, by lowercase class name (which is how recipes refer to them)
+    registry = {}
 
     def __init_subclass__(cls, dynamic=False, **kwargs):
         # only dynamic ones will be checked for completion
         super().__init_subclass__(**kwargs)
         cls.dynamic = dynamic
+        Blessed.registry[cls.__name__.lower()] = cls
 
     def __init__(self, seed=1, general_settings=[], block_settings=[], user_data=[], previous_trials=[]):
         # general settings are settings like
@@ -27,6 +30,22 @@ class Blessed(object):
         # return the next value from the generator
         pass
 
+    def sample(self, n):
+        # return the next n values at once, as a 1D array (see `as_column`)
+        # subclasses should override this with a vectorized version
+        # that gives the same values as n calls to next()
+        return as_column([self.next() for i in range(n)])
+
+
+def as_column(values):
+    # 1D array, one element per trial. Anything that isn't a plain
+    # scalar (e.g. a list per trial) is kept as-is in an object array
+    col = np.asarray(values)
+    if col.ndim != 1 or col.dtype.kind not in 'biufUS':
+        col = np.empty(len(values), dtype=object)
+        col[:] = list(values)
+    return col
+
 
 class Fixed(Blessed):
     def __init__(self, value, **kwargs):
@@ -36,6 +55,9 @@ class Fixed(Blessed):
     def next(self):
         return self.value
 
+    def sample(self, n):
+        return as_column([self.value] * n)
+
 
 class Uniform(Blessed):
     def __init__(self, low, high, **kwargs):
@@ -45,6 +67,23 @@ class Uniform(Blessed):
     def next(self):
         return self.rng.uniform(self.low, self.high, None)
 
+    def sample(self, n):
+        return self.rng.uniform(self.low, self.high, n)
+
+
+def redraw_zeros(draw, n):
+    # draw n values, redrawing any (rare) exact zeros
+    out = draw(n)
+    count = 0
+    zeros = np.flatnonzero(out == 0)
+    while zeros.size:
+        out[zeros] = draw(zeros.size)
+        zeros = zeros[out[zeros] == 0]
+        count += 1
+        if count > 100:
+            raise ValueError('Too many iterations.')
+    return out
+
 
 class NonzeroUniform(Uniform):
     def next(self):
@@ -57,6 +96,9 @@ class NonzeroUniform(Uniform):
                 raise ValueError('Too many iterations.')
         return proposed
 
+    def sample(self, n):
+        return redraw_zeros(lambda k: self.rng.uniform(self.low, self.high, k), n)
+
 
 class Normal(Blessed):
     def __init__(self, loc, scale, **kwargs):
@@ -66,6 +108,9 @@ class Normal(Blessed):
     def next(self):
         return self.rng.normal(self.loc, self.scale, None)
 
+    def sample(self, n):
+        return self.rng.normal(self.loc, self.scale, n)
+
 
 class NonzeroNormal(Normal):
     def next(self):
@@ -78,6 +123,9 @@ class NonzeroNormal(Normal):
                 raise ValueError('Too many iterations.')
         return proposed
 
+    def sample(self, n):
+        return redraw_zeros(lambda k: self.rng.normal(self.loc, self.scale, k), n)
+
 
 class Choice(Blessed):
     def __init__(self, options, probs, **kwargs):
@@ -87,6 +135,11 @@ class Choice(Blessed):
     def next(self):
         return self.rng.choice(self.options, p=self.probs)
 
+    def sample(self, n):
+        # one CDF for the whole block, rather than one per trial
+        idx = self.rng.choice(len(self.options), size=n, p=self.probs)
+        return as_column(self.options)[idx]
+
 # was thinking about making this a 'dynamic'
 # one (so that it fits in with the other
 # early termination ones), but I think
@@ -105,6 +158,11 @@ class TgtColumn(Blessed):
         self.counter += 1
         return row
 
+    def sample(self, n):
+        rows = as_column(self.column[self.counter:self.counter + n])
+        self.counter += len(rows)
+        return rows
+
 
 class Criterion(Blessed, dynamic=True):
     def __init__(self, values=[0.75, 0.5], consecutive=4, **kwargs):
@@ -153,3 +211,12 @@ class PiecewiseUniform(Blessed):
         # then generate value
         interval = self.intervals[interval_choice]
         return self.rng.uniform(low=interval[0], high=interval[1])
+
+    def sample(self, n):
+        # next() alternates between the interval draw and the value draw,
+        # so interleave them here too to get the same sequence
+        u = self.rng.random_sample((n, 2))
+        cdf = np.cumsum(self.probs)
+        cdf /= cdf[-1]
+        interval = np.array(self.intervals)[cdf.searchsorted(u[:, 0], side='right')]
+        return interval[:, 0] + (interval[:, 1] - interval[:, 0]) * u[:, 1]
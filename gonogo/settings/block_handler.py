@@ -1,4 +1,5 @@
 
+import numpy as np
 from . blessed_gen import Blessed
 # generational_values is dictionary of key: (Blessed, kwarg) pairs
 # Blessed are not yet instantiated
@@ -41,12 +42,28 @@ class BlockHandler(object):
             bdict.pop(key, None)
         self.trial_by_trial_settings = bdict
 
+        # generate the whole trial table up front for everything that doesn't
+        # depend on the user's performance (one row per trial, up to `trials`).
+        # Dynamic generators are still asked for a value every trial
+        static_keys = [k for k in bdict if not bdict[k].dynamic]
+        columns = [bdict[k].sample(self.trials) for k in static_keys]
+        for key, col in zip(static_keys, columns):
+            if len(col) < self.trials:  # e.g. a TgtColumn that's too short
+                raise ValueError('Column "%s" has %i rows, but block "%s" has %i trials.' %
+                                 (key, len(col), self.name, self.trials))
+        self.table = np.empty(self.trials, dtype=[(k, c.dtype) for k, c in zip(static_keys, columns)])
+        for key, col in zip(static_keys, columns):
+            self.table[key] = col
+        self.dynamic_keys = [k for k in bdict if bdict[k].dynamic]
+
     def next(self):
         # generate the next dictionary, and store a copy in previous_trials
-        output = {}
+        # (plain python values, same key order as the settings)
+        row = dict(zip(self.table.dtype.names, self.table[self.counter].item()))
         tbts = self.trial_by_trial_settings
-        for key in tbts:
-            output[key] = tbts[key].next()
+        for key in self.dynamic_keys:
+            row[key] = tbts[key].next()
+        output = {key: row[key] for key in tbts}
 
         self.previous_trials.append(output.copy())
         self.counter += 1
@@ -0,0 +1,115 @@
+import glob
+import hashlib
+import os
+import pickle
+from collections import namedtuple
+
+from gonogo import __version__
+from .resolve import resolve_settings
+
+# Compiled session plans.
+# Resolving a recipe means parsing every default TOML, the recipe itself, and
+# any csv tables it references. Instead, we do that once, and pickle the
+# result (the proto-block-handlers + plain dicts from `resolve_settings`)
+# to a cache directory, keyed by a hash of the recipe, the defaults, and the
+# gonogo version. The plan also records the digests of the tables it read,
+# so editing a csv triggers a rebuild too.
+#
+# Plans can be pre-built for a whole study with:
+#     python -m gonogo.settings.plan recipes/*.toml
+
+PLAN_VERSION = 1  # bump if the plan layout changes
+SessionPlan = namedtuple('SessionPlan', ['version', 'key', 'blocks', 'resolved', 'tables'])
+
+
+def _digest(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def plan_key(recipe_path, default_path):
+    # canonical hash of the inputs we know about before parsing anything:
+    # format version, gonogo version, recipe, and defaults (in sorted order)
+    h = hashlib.sha256()
+    h.update(('%i|%s|' % (PLAN_VERSION, __version__)).encode('utf-8'))
+    with open(recipe_path, 'rb') as f:
+        h.update(f.read())
+    for fn in sorted(glob.glob(default_path + '*.toml')):
+        h.update(os.path.basename(fn).encode('utf-8'))
+        with open(fn, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def compile_plan(recipe_path, default_path):
+    blocks, resolved = resolve_settings(recipe_path, default_path)
+    tables = {}
+    for block in resolved:
+        fn = block.get('file', None)
+        if fn is not None:
+            tables[fn] = _digest(fn)
+    return SessionPlan(PLAN_VERSION, plan_key(recipe_path, default_path),
+                       blocks, resolved, tables)
+
+
+def _plan_name(recipe_path, cache_dir):
+    # one plan per recipe (overwritten when stale); the path hash keeps
+    # same-named recipes in different folders apart
+    strip_name = os.path.splitext(os.path.basename(recipe_path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(recipe_path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, '%s_%s.pkl' % (strip_name, path_hash[:8]))
+
+
+def _is_current(plan, key):
+    if not isinstance(plan, SessionPlan) or plan.version != PLAN_VERSION or plan.key != key:
+        return False
+    try:
+        return all(_digest(fn) == dig for fn, dig in plan.tables.items())
+    except OSError:  # table went missing
+        return False
+
+
+def load_plan(recipe_path, default_path, cache_dir=None):
+    """Load the compiled plan for a recipe, (re)building it if any input changed.
+
+    Returns the same (proto_block, resolved_dict) pair as `resolve_settings`.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(recipe_path), '.plans')
+    key = plan_key(recipe_path, default_path)
+    plan_name = _plan_name(recipe_path, cache_dir)
+    try:
+        with open(plan_name, 'rb') as f:
+            plan = pickle.load(f)
+    except Exception:  # missing, truncated, or from an incompatible version
+        plan = None
+    if plan is None or not _is_current(plan, key):
+        plan = compile_plan(recipe_path, default_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # write to the side and swap in, so a crash never leaves half a plan
+            tmp_name = plan_name + '.tmp'
+            with open(tmp_name, 'wb') as f:
+                pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, plan_name)
+        except OSError:  # e.g. read-only recipes, just don't persist
+            pass
+    return plan.blocks, plan.resolved
+
+
+if __name__ == '__main__':
+    import argparse
+    from timeit import default_timer
+    # import properly, so SessionPlan isn't pickled as __main__.SessionPlan
+    from gonogo.settings import plan as _plan
+
+    parser = argparse.ArgumentParser(description='Pre-build session plans for recipes.')
+    parser.add_argument('recipes', nargs='+', help='recipe (.toml) files')
+    parser.add_argument('--defaults', default='recipes/defaults/', help='directory of default recipes')
+    parser.add_argument('--cache', default=None, help='where to put plans (default: <recipe dir>/.plans)')
+    args = parser.parse_args()
+    defaults = os.path.join(args.defaults, '')
+    for recipe in args.recipes:
+        t0 = default_timer()
+        blocks, _ = _plan.load_plan(recipe, defaults, args.cache)
+        print('%s: %i blocks (%.1f ms)' % (recipe, len(blocks), 1000 * (default_timer() - t0)))
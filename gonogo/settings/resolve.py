@@ -6,9 +6,10 @@ from warnings import warn
 import csv
 from ast import literal_eval
 
+import numpy as np
 from pip._vendor import pytoml as toml
 
-from .blessed_gen import Blessed, Fixed, Normal, TgtColumn, Uniform, Choice, Criterion, PiecewiseUniform, NonzeroNormal, NonzeroUniform
+from .blessed_gen import Blessed, Fixed, TgtColumn
 
 
 def resolve_settings(recipe_path, default_path='settingsstuff/defaults/'):
@@ -42,9 +43,6 @@ def resolve_settings(recipe_path, default_path='settingsstuff/defaults/'):
     proto_block = []  # what we actually return (list of settings dicts)
 
     # generate all the trial tables now, based off settings
-    # pull locals (or globals? maybe if this ends up being a function)
-    locs = globals()
-    loc_keys = locs.keys()
     filename = None  # set to None by default, and only fill in if the key is there
     name = None
     trials = None
@@ -70,12 +68,11 @@ def resolve_settings(recipe_path, default_path='settingsstuff/defaults/'):
                 if 'fun' not in setting.keys():
                     raise ValueError("""For fancy generators, the blessed class must be specified in `fun`.""")
                 blessed_gen_name = setting['fun']
-                lowkeys = [l.lower() for l in loc_keys]
                 # retrieve the blessed generator
-                # a little tricky b/c we try not to enforce matching case
+                # (registry is lowercase, b/c we try not to enforce matching case)
                 try:
-                    blessed_gen = next(locs[x] for x in loc_keys if x.lower() == blessed_gen_name.lower())
-                except StopIteration:
+                    blessed_gen = Blessed.registry[blessed_gen_name.lower()]
+                except KeyError:
                     raise ValueError('Specified generator "%s" not amongst the Blessed.' % blessed_gen_name)
                 # we don't strictly *need* kwargs, but tell the user it may be funky
                 try:
@@ -99,11 +96,11 @@ def resolve_settings(recipe_path, default_path='settingsstuff/defaults/'):
         if filename is not None:
             # fancy pants stuff for file import
             fn, extension = os.path.splitext(filename)
-            if extension != '.csv':
-                warn(('If file in block %i is a not a csv, further steps may fail '
+            if extension not in ['.csv', '.npy', '.npz']:
+                warn(('If file in block %i is a not a csv, npy or npz, further steps may fail '
                       '(Unless this file *is* comma separated).') % block_num)
 
-            datafile = read_csv(filename)  # try to read the file (using our own csv machinery, not pandas)
+            datafile = read_table(filename)  # try to read the file (using our own machinery, not pandas)
             # TODO: is there a way to verify datafile.keys?
             # I suppose later in the process we can check against the settings
             # the experiment is expecting
@@ -125,13 +122,52 @@ def resolve_settings(recipe_path, default_path='settingsstuff/defaults/'):
     return proto_block, out_dict
 
 
+def read_table(filename):
+    # dictionary of column name: 1D array (one element per trial)
+    extension = os.path.splitext(filename)[1]
+    if extension == '.npy':
+        # structured array, one field per column (memory-mapped, so big tables are cheap)
+        data = np.load(filename, mmap_mode='r')
+        if data.dtype.names is None:
+            raise ValueError('%s should be a structured array (one field per column).' % filename)
+        return {k: data[k] for k in data.dtype.names}
+    if extension == '.npz':
+        # one array per column
+        with np.load(filename) as data:
+            return {k: data[k] for k in data.files}
+    return read_csv(filename)
+
+
 def read_csv(filename):
-    with open(filename, 'r') as csf:
-        reader = csv.DictReader(csf)
-        out = {k: [] for k in reader.fieldnames}
+    with open(filename, 'r', newline='') as csf:
+        reader = csv.reader(csf)
+        header = next(reader)
+        rows = []
         for row in reader:
-            for key in row.keys():
-                out[key].append(literal_eval(row[key].replace(' ', '')))
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError('%s, line %i: %i cells, but the header has %i columns.' %
+                                 (filename, reader.line_num, len(row), len(header)))
+            rows.append([cell.replace(' ', '') for cell in row])
+        # cells as strings, column-wise
+        cols = list(zip(*rows))
+    if not cols:
+        return {k: np.array([]) for k in header}
+    return {k: _parse_column(col) for k, col in zip(header, cols)}
+
+
+def _parse_column(cells):
+    # infer the type for the whole column at once (ints, then floats),
+    # and only evaluate cell-by-cell for anything else (e.g. lists)
+    cells = np.array(cells)
+    for dtype in (np.int64, np.float64):
+        try:
+            return cells.astype(dtype)
+        except ValueError:
+            pass
+    out = np.empty(len(cells), dtype=object)
+    out[:] = [literal_eval(c) for c in cells]
     return out
 
 
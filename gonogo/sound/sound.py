@@ -1,10 +1,13 @@
 import atexit
 import wave
 
+import os
 import numpy as np
 import psychtoolbox as ptb
 from psychtoolbox import PsychPortAudio as ppa
 
+from gonogo.utils.trace_events import tracer
+
 # master singleton soundcard
 soundcard = None
 # rather than reloading the sound each time (and using
@@ -43,17 +46,19 @@ class Sound(object):
         data = np.frombuffer(raw_data, dtype='int16')/(2**16)
         data = rescale(data, old_min=min(data), old_max=max(data))
         data = data.reshape(-1, n_channels)
-        return cls(data, file_rate)
+        name = os.path.splitext(os.path.basename(filename))[0]
+        return cls(data, file_rate, name=name)
 
-    def __init__(self, data, file_rate):
+    def __init__(self, data, file_rate, name='sound'):
         self._state = 'stop'
+        self.name = name
         soundcard = Soundcard()
         status = ppa('GetStatus', soundcard)
         data = np.atleast_2d(data)
         # catch if input shape is flipped around (should be nx2, not 2xn)
         if data.shape[0] < data.shape[1]:
             data = data.T
-        hsh = hash(data.tostring())
+        hsh = hash(data.tobytes())
         if hsh not in sound_cache.keys():
             # one handle+buffer per sound
             self.handle = ppa('OpenSlave', soundcard, 1)
@@ -76,6 +81,7 @@ class Sound(object):
 
     def play(self):
         if self.state != 'play':
+            tracer.instant(self.name, 'sound')
             ppa('Start', self.handle)
 
     def stop(self):
@@ -0,0 +1,169 @@
+from copy import copy
+from inspect import ismethod
+from math import ceil
+
+import numpy as np
+
+from mglg.math.vector import (VectorBase, _Component, _Gather, _Slice,
+                               resolve_swizzle)
+
+# Drop-in for toon.anim.Player, for timelines that are fully known before
+# they start (e.g. everything set up in BaseDrop.setup_trial).
+# Tracks are added as usual; bake() (in the inter-trial interval) then samples
+# every track once per frame with Track.at, into one table per track. While
+# playing, advance() writes out the row for the frame nearest the given time
+# (start + k * frame_period), so the frame loop is just indexing; flip times
+# jitter around the grid, and the row is what Player would give at the frame
+# the time is closest to. seek() evaluates the tracks at exactly the given
+# time instead, like Player.advance (e.g. GoNo's jump to the press time).
+# Writing out:
+# - swizzles on vectors (e.g. 'y' on a position, 'rgb' on a color) are written
+#   straight into the vector
+# - anything else gets what Player would have given it (setattr/callable)
+# start/stop/repeat behave like Player (stopping is based on the actual time).
+
+
+class _Baked(object):
+    def __init__(self, track, attr, obj, kwargs):
+        self.track = track
+        self.attr = attr
+        self.obj = obj
+        self.kwargs = kwargs
+        self.table = None  # (frames,) or (frames, components) array, or a list
+        self.values = None  # same, as Python values (for setattr/callables)
+        self.writers = []  # (write(value), takes rows of `table`?) per target
+
+    def bake(self, times):
+        # sample a copy (newer toon's Track keeps a search cursor, which
+        # shouldn't be left at the end for the off-grid lookups)
+        sampler = copy(self.track)
+        values = [sampler.at(t) for t in times]
+        try:
+            table = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):  # e.g. strings, ragged
+            table = None
+        targets = self.obj
+        if type(targets) not in (list, tuple):
+            targets = [targets]
+        self.writers = [self._writer(obj, table) for obj in targets]
+        self.table = table
+        self.values = values
+
+    def _writer(self, obj, table):
+        attr, kwargs = self.attr, self.kwargs
+        if table is not None and isinstance(attr, str) and isinstance(obj, VectorBase):
+            accessor = resolve_swizzle(attr, obj.shape[0])
+            if isinstance(accessor, _Component):
+                key = accessor.index
+            elif isinstance(accessor, _Slice):
+                key = accessor.slc
+            elif isinstance(accessor, _Gather):
+                key = accessor.array
+            else:
+                key = None
+            if key is not None:
+                def write(row):
+                    obj[key] = row  # straight into the vector
+                return write, True
+        if callable(attr):
+            if ismethod(attr):
+                return (lambda val: attr(val, **kwargs)), False
+            return (lambda val: attr(val, obj, **kwargs)), False
+        return (lambda val: setattr(obj, attr, val)), False
+
+    def apply(self, k):
+        for write, raw in self.writers:
+            write(self.table[k] if raw else self.values[k])
+
+    def apply_at(self, time):
+        # exact time, so same as Player
+        val = self.track.at(time)
+        for write, _ in self.writers:
+            write(val)
+
+
+class BakedPlayer(object):
+    def __init__(self, frame_period, repeats=1):
+        self.frame_period = frame_period
+        self.tracks = []
+        self.state = 'stopped'
+        self.ref_time = 0
+        self.duration = 0
+        self.timescale = 1
+        if repeats < 1:
+            raise ValueError('Number of repeats must be > 1 (or math.inf)')
+        self._repeats = repeats
+        self.repeats = repeats
+        self.frames = 0  # rows per table (0 until baked)
+
+    def add(self, track, attr, obj=None, **kwargs):
+        # same as Player.add (obj=None isn't supported, as there's no mixin use)
+        self.tracks.append(_Baked(copy(track), attr, obj, kwargs))
+        self.duration = max(self.duration, track.duration())
+        self.frames = 0
+
+    def bake(self):
+        # sample all tracks at every frame (including the first at/after `duration`)
+        fp = self.frame_period
+        self.frames = int(ceil(self.duration / fp)) + 1
+        times = [k * fp for k in range(self.frames)]
+        times[-1] = max(times[-1], self.duration)  # in case of rounding
+        for trk in self.tracks:
+            trk.bake(times)
+
+    def start(self, time):
+        if not self.frames:
+            self.bake()
+        self.ref_time = time
+        self._repeats = self.repeats
+        self.state = 'playing'
+        self.advance(time)
+
+    def stop(self):
+        self.state = 'stopped'
+
+    def reset(self):
+        self.start(self.ref_time)
+        self.stop()
+
+    def resume(self, time):
+        if self.state == 'playing':
+            return
+        self.start(time)
+
+    def advance(self, time):
+        # show the frame nearest `time` (e.g. the predicted flip time)
+        self._advance(time, False)
+
+    def seek(self, time):
+        # show exactly `time`, same as Player.advance
+        self._advance(time, True)
+
+    def _advance(self, time, exact):
+        if self.state != 'playing':
+            return
+        if time < self.ref_time:
+            return
+        elapsed = (time - self.ref_time) * self.timescale
+        if exact and elapsed < self.duration:
+            for trk in self.tracks:
+                trk.apply_at(elapsed)
+        else:
+            # (past the end, everything's at its last value, i.e. the last row)
+            k = min(int(elapsed / self.frame_period + 0.5), self.frames - 1)
+            for trk in self.tracks:
+                trk.apply(k)
+        if time - self.ref_time >= self.duration:
+            self._repeats -= 1
+            if self._repeats < 1:
+                self.state = 'stopped'
+            else:
+                self.ref_time = time
+
+    @property
+    def is_playing(self):
+        return self.state == 'playing'
+
+    @property
+    def is_stopped(self):
+        return self.state == 'stopped'
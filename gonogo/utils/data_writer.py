@@ -0,0 +1,147 @@
+import atexit
+import csv
+import os
+import threading
+from queue import Empty, Full, Queue
+from warnings import warn
+
+from gonogo.utils.trace_store import TraceStore
+
+# Write-behind persistence for a block. The render thread only puts finished
+# trials on a bounded queue; a background thread owns every file handle for
+# the block (summary csv + binary traces), batches whatever is pending, and
+# flushes once per batch. On close (or interpreter exit), the queue is
+# drained and the files are fsync'd. If the thread has died (or is stuck on
+# the disk), close() gives up after `timeout` & warns about what didn't make it.
+# (Exiting on SIGTERM is up to the application, see main.py.)
+
+_STOP = object()
+_open_writers = set()
+_atexit_installed = False
+
+
+def _drain_all():
+    for writer in list(_open_writers):
+        try:
+            writer.close()
+        except Exception as e:  # keep going, so the other blocks still get closed
+            warn('DataWriter for %s failed: %r' % (writer.block_path, e))
+
+
+def _install_atexit():
+    global _atexit_installed
+    if not _atexit_installed:
+        _atexit_installed = True
+        atexit.register(_drain_all)
+
+
+class DataWriter(threading.Thread):
+    def __init__(self, block_path, summary_name, maxsize=32):
+        super().__init__(name='DataWriter', daemon=True)
+        self.block_path = block_path
+        self.summary_name = summary_name
+        # bounded, so a *very* slow disk eventually applies back-pressure
+        # rather than eating all the memory
+        self.queue = Queue(maxsize=maxsize)
+        self.error = None
+        self.lost = []  # trials taken off the queue, but not written (if the thread died)
+        self._closed = False
+        self._summary_file = None
+        self._summary_writer = None
+        self._traces = None
+        _install_atexit()
+        _open_writers.add(self)
+        self.start()
+
+    def write(self, trial, summary, long_data, ref_time, dropped_frames):
+        self._check_error()
+        self.queue.put((trial, summary, long_data, ref_time, dropped_frames))
+
+    def close(self, timeout=10.0):
+        if self._closed:
+            return
+        self._closed = True
+        _open_writers.discard(self)
+        queued_stop = False
+        if self.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+                queued_stop = True
+            except Full:  # not draining
+                pass
+            self.join(timeout)
+        if self.is_alive():
+            warn('DataWriter for %s still busy after %.1fs, giving up on %i pending trial(s)'
+                 % (self.block_path, timeout, self.queue.qsize() - queued_stop))
+        else:
+            # thread's gone, so whatever is still queued was never written
+            lost = list(self.lost)
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except Empty:
+                    break
+                if item is not _STOP:
+                    lost.append(item[0])
+            if lost:
+                warn('DataWriter for %s stopped early, trial(s) %s were not written'
+                     % (self.block_path, ', '.join(str(t) for t in lost)))
+        self._check_error()
+
+    def _check_error(self):
+        if self.error is not None:
+            err, self.error = self.error, None
+            raise err
+
+    def run(self):
+        done = False
+        pending = []
+        try:
+            while not done:
+                pending = [self.queue.get()]
+                # pick up anything else that's pending
+                while True:
+                    try:
+                        pending.append(self.queue.get_nowait())
+                    except Empty:
+                        break
+                while pending:
+                    item = pending[0]
+                    if item is _STOP:
+                        done = True
+                    else:
+                        self._write(*item)
+                    pending.pop(0)
+                self._flush()
+        except Exception as e:
+            self.error = e
+            self.lost = [item[0] for item in pending if item is not _STOP]
+        finally:
+            self._finish()
+
+    def _write(self, trial, summary, long_data, ref_time, dropped_frames):
+        if self._summary_writer is None:
+            self._summary_file = open(self.summary_name, 'w', newline='')
+            self._summary_writer = csv.DictWriter(self._summary_file, summary.keys())
+            self._summary_writer.writeheader()
+            self._traces = TraceStore(self.block_path)
+        self._summary_writer.writerow(summary)
+        self._traces.append(trial, long_data, ref_time, dropped_frames)
+
+    def _flush(self):
+        if self._summary_file is not None:
+            self._summary_file.flush()
+            self._traces.flush()
+
+    def _finish(self):
+        if self._summary_file is None:
+            return
+        self._flush()
+        for f in [self._summary_file] + self._traces.files():
+            try:
+                os.fsync(f.fileno())
+            except OSError:
+                pass
+        self._summary_file.close()
+        self._traces.close()
+        self._summary_file = None
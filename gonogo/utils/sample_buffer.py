@@ -0,0 +1,92 @@
+from math import ceil
+from warnings import warn
+
+import numpy as np
+from toon.input import TsArray
+
+# Preallocated storage for device data within a trial.
+# `MpDevice.read()` returns views into its own (reused) buffers, so previously
+# every frame's read was `.copy()`ed into a list and `stack`ed at the end of
+# the trial. Instead, we copy each read straight into preallocated arrays
+# (one per device field), and hand out views at the end of the trial.
+# Capacity is fixed per block (only growing in the inter-trial interval if a
+# longer trial needs it); if a trial still manages to overrun, the oldest
+# samples are overwritten (like the device's own circular buffer).
+
+
+class SampleBuffer(object):
+    def __init__(self, sampling_frequency=None, margin=2.0):
+        # toon devices default to 500Hz if they don't say otherwise
+        self.sampling_frequency = sampling_frequency or 500
+        self.margin = margin
+        self.capacity = 0
+        self._returns = None  # the device's Returns namedtuple
+        self._data = {}
+        self._time = {}
+        self._count = {}
+
+    def reserve(self, duration, frame_period):
+        # enough for `duration` seconds at the sampling rate, plus a sample or two
+        # per frame for reads that straddle frames
+        frames = ceil(duration / frame_period) + 1
+        per_frame = ceil(self.sampling_frequency * frame_period) + 2
+        capacity = int(frames * per_frame * self.margin)
+        if capacity > self.capacity:
+            self.capacity = capacity
+            # reallocate lazily (we need to see the data to know dtypes/shapes)
+            self._data.clear()
+            self._time.clear()
+        self.reset()
+
+    def reset(self):
+        for field in self._count:
+            self._count[field] = 0
+
+    def extend(self, data):
+        # copy a single device read (a Returns namedtuple) into the buffer
+        if self._returns is None:
+            self._returns = type(data)
+        cap = self.capacity
+        for field, obs in zip(data._fields, data):
+            if obs is None:
+                continue
+            if field not in self._data:
+                self._allocate(field, obs)
+            buf = self._data[field]
+            times = self._time[field]
+            n = obs.shape[0]
+            start = self._count[field] % cap
+            stop = start + n
+            if stop <= cap:
+                buf[start:stop] = obs
+                times[start:stop] = obs.time
+            else:  # wrap around (or, pathologically, more than the capacity in one read)
+                idx = np.arange(start, stop) % cap
+                buf[idx[-cap:]] = obs[-cap:]
+                times[idx[-cap:]] = obs.time[-cap:]
+            self._count[field] += n
+
+    def _allocate(self, field, obs):
+        cap = self.capacity
+        if cap <= 0:
+            raise ValueError('Call reserve() before adding data.')
+        self._data[field] = np.zeros((cap,) + obs.shape[1:], dtype=obs.dtype)
+        self._time[field] = np.zeros(cap, dtype=np.float64)
+        self._count[field] = 0
+
+    def view(self):
+        # everything since the last reset(), as a Returns of TsArrays (None if no data)
+        out = []
+        for field in self._returns._fields:
+            count = self._count.get(field, 0)
+            if count == 0:
+                out.append(None)
+            elif count <= self.capacity:  # zero-copy
+                out.append(TsArray(self._data[field][:count],
+                                   time=self._time[field][:count]))
+            else:  # overran, so reorder oldest -> newest (this copies)
+                warn('Sample buffer overrun for %s, oldest data lost.' % field)
+                shift = -(count % self.capacity)
+                out.append(TsArray(np.roll(self._data[field], shift, axis=0),
+                                   time=np.roll(self._time[field], shift)))
+        return self._returns(*out)
@@ -0,0 +1,156 @@
+import json
+from timeit import default_timer
+
+import numpy as np
+
+# Timeline of what happened when, for lining up stalls against dropped frames
+# after a session. Exports Chrome's trace event format (JSON), which opens in
+# chrome://tracing or https://ui.perfetto.dev
+#
+# Events go into preallocated arrays (no allocation while recording), with
+# times from `clock` (ExpWindow points it at its own clock, i.e. toon's
+# mono_clock, which the device process also stamps its data with). If the
+# buffer fills up, further events are dropped (& counted).
+#
+# Usage:
+#     with tracer.span('setup_trial'):
+#         ...
+#     tracer.instant('flip', track='flips', value=dt)
+#     tracer.complete('buttons', t_first, t_last, track='device')
+
+# phases (as in the trace event format)
+_BEGIN, _END, _INSTANT, _COMPLETE, _COUNTER = range(5)
+_PHASES = 'BEiXC'
+
+# track: (process id, thread id); anything else goes on its own thread of the main process
+TRACKS = {'main': (1, 1), 'flips': (1, 2), 'sound': (1, 3), 'device': (2, 1)}
+_PROCESSES = {1: 'gonogo', 2: 'device'}
+
+
+class _Span(object):
+    def __init__(self, tracer, name, track):
+        self.tracer = tracer
+        self.name = name
+        self.track = track
+
+    def __enter__(self):
+        tracer = self.tracer
+        tracer._add(_BEGIN, self.name, self.track, tracer.clock())
+        return self
+
+    def __exit__(self, *args):
+        tracer = self.tracer
+        tracer._add(_END, self.name, self.track, tracer.clock())
+
+
+class TraceEvents(object):
+    def __init__(self, clock=default_timer, size=1 << 18):
+        self.clock = clock
+        self.size = size
+        self.phase = np.zeros(size, np.uint8)
+        self.name = np.zeros(size, np.int32)
+        self.track = np.zeros(size, np.int32)
+        self.time = np.zeros(size, np.float64)  # seconds
+        self.value = np.zeros(size, np.float64)  # duration for complete events, else an argument
+        self.count = 0
+        self.dropped = 0
+        self.names = []  # interned names (for both events & tracks)
+        self._ids = {}
+        self._spans = {}
+
+    def _id(self, name):
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def _add(self, phase, name, track, time, value=np.nan):
+        i = self.count
+        if i >= self.size:
+            self.dropped += 1
+            return
+        self.phase[i] = phase
+        self.name[i] = self._id(name)
+        self.track[i] = self._id(track)
+        self.time[i] = time
+        self.value[i] = value
+        self.count = i + 1
+
+    def span(self, name, track='main'):
+        # `with tracer.span(name):` (re-usable, so can be made once up front)
+        key = name, track
+        span = self._spans.get(key)
+        if span is None:
+            span = self._spans[key] = _Span(self, name, track)
+        return span
+
+    def begin(self, name, track='main', time=None):
+        self._add(_BEGIN, name, track, self.clock() if time is None else time)
+
+    def end(self, name, track='main', time=None):
+        self._add(_END, name, track, self.clock() if time is None else time)
+
+    def instant(self, name, track='main', time=None, value=np.nan):
+        self._add(_INSTANT, name, track, self.clock() if time is None else time, value)
+
+    def complete(self, name, start, stop, track='main'):
+        # something that happened from `start` to `stop` (e.g. a batch of device samples)
+        self._add(_COMPLETE, name, track, start, stop - start)
+
+    def counter(self, name, value, time=None):
+        self._add(_COUNTER, name, 'main', self.clock() if time is None else time, value)
+
+    def clear(self):
+        self.count = 0
+        self.dropped = 0
+
+    def events(self):
+        # as a list of trace event dicts (ts & dur in microseconds)
+        out = []
+        tracks = {}
+        for i in range(self.count):
+            track = self.names[self.track[i]]
+            pid, tid = tracks.get(track) or tracks.setdefault(
+                track, TRACKS.get(track, (1, 10 + len(tracks))))
+            phase = self.phase[i]
+            evt = {'name': self.names[self.name[i]], 'ph': _PHASES[phase],
+                   'ts': 1e6 * self.time[i], 'pid': pid, 'tid': tid}
+            value = self.value[i]
+            if phase == _COMPLETE:
+                evt['dur'] = 1e6 * value
+            elif phase == _INSTANT:
+                evt['s'] = 't'
+                if not np.isnan(value):
+                    evt['args'] = {'value': value}
+            elif phase == _COUNTER:
+                evt['args'] = {evt['name']: value}
+            out.append(evt)
+        # label the processes & threads
+        for pid, name in _PROCESSES.items():
+            out.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                        'args': {'name': name}})
+        for track, (pid, tid) in tracks.items():
+            out.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                        'args': {'name': track}})
+        return out
+
+    def export(self, filename, **metadata):
+        metadata['dropped_events'] = self.dropped
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': self.events(), 'displayTimeUnit': 'ms',
+                       'otherData': metadata}, f)
+
+
+# shared by everything (scenes, window, sounds)
+tracer = TraceEvents()
+
+
+def trace_device(data, track='device'):
+    # a device read (toon's Returns): one event per field, spanning the
+    # timestamps of its samples (i.e. when the device process saw them)
+    for field in data._fields:
+        dat = getattr(data, field)
+        if dat is None or dat.shape[0] == 0:
+            continue
+        tracer.complete(field, dat.time[0], dat.time[-1], track)
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+
+# Block-level, append-only storage for the per-trial device data.
+# Every field of the device's Returns tuple gets its own growable .npy file
+# (e.g. traces/buttons.npy), holding structured records of
+# (trial, time, data), where time is relative to the trial's reference time.
+# The .npy header is padded so the row count can be rewritten in place after
+# every append, which means the file is always loadable (even mid-block) via
+# `np.load(..., mmap_mode='r')` or `load_block` below.
+
+_MAGIC = b'\x93NUMPY\x01\x00'
+_COUNT_WIDTH = 20  # room for any row count we'll ever see
+
+
+def _header(dtype, count, length=None):
+    descr = np.lib.format.dtype_to_descr(np.dtype(dtype))
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, count)
+    if length is None:
+        # pad so that magic + header length + header is a multiple of 64,
+        # leaving space for the count to grow
+        length = len(header) + _COUNT_WIDTH + 1
+        length += 64 - ((len(_MAGIC) + 2 + length) % 64)
+    header = header.ljust(length - 1) + '\n'
+    return _MAGIC + np.array(length, dtype='<u2').tobytes() + header.encode('latin1')
+
+
+class GrowableNpy(object):
+    def __init__(self, filename, dtype):
+        self.filename = filename
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self._file = open(filename, 'wb+')
+        head = _header(self.dtype, 0)
+        self._header_len = len(head) - len(_MAGIC) - 2
+        self._file.write(head)
+
+    def append(self, records):
+        records = np.asarray(records, dtype=self.dtype)
+        if records.size == 0:
+            return
+        f = self._file
+        f.seek(0, os.SEEK_END)
+        f.write(records.tobytes())
+        self.count += records.size
+        # update the row count in place
+        f.seek(0)
+        f.write(_header(self.dtype, self.count, self._header_len))
+
+    def flush(self):
+        self._file.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def trace_dtype(data):
+    # one record per observation, keeping the device's own dtype & shape
+    return np.dtype([('trial', np.int32), ('time', np.float64),
+                     ('data', data.dtype, data.shape[1:])])
+
+
+dropped_dtype = np.dtype([('trial', np.int32), ('time', np.float64), ('dt', np.float64)])
+
+
+class TraceStore(object):
+    def __init__(self, block_path):
+        self.trace_path = os.path.join(block_path, 'traces')
+        os.makedirs(self.trace_path, exist_ok=True)
+        self.dropped = GrowableNpy(os.path.join(block_path, 'dropped_frames.npy'),
+                                   dropped_dtype)
+        self.fields = {}  # opened lazily, as we only know the dtype after the first data
+
+    def append(self, trial, long_data, ref_time, dropped_frames):
+        for field in long_data._fields:
+            dat = getattr(long_data, field)
+            if dat is None:
+                continue
+            if field not in self.fields:
+                self.fields[field] = GrowableNpy(os.path.join(self.trace_path, field + '.npy'),
+                                                 trace_dtype(dat))
+            out = self.fields[field]
+            records = np.empty(dat.shape[0], dtype=out.dtype)
+            records['trial'] = trial
+            # subtract off ref_time so time is relative to trial start
+            records['time'] = dat.time - ref_time
+            records['data'] = dat
+            out.append(records)
+
+        if dropped_frames:
+            records = np.empty(len(dropped_frames), dtype=dropped_dtype)
+            dropped_frames = np.asarray(dropped_frames, dtype=np.float64)
+            records['trial'] = trial
+            records['time'] = dropped_frames[:, 0]
+            records['dt'] = dropped_frames[:, 1]
+            self.dropped.append(records)
+
+    def files(self):
+        return [self.dropped] + list(self.fields.values())
+
+    def flush(self):
+        for f in self.files():
+            f.flush()
+
+    def close(self):
+        for f in self.files():
+            f.close()
+
+
+def _load(filename):
+    try:
+        return np.load(filename, mmap_mode='r')
+    except ValueError:  # can't memory-map an empty file
+        return np.load(filename)
+
+
+def load_block(block_path):
+    """Memory-map all traces (and dropped frames) for a single block.
+
+    Returns a dictionary of field name: structured array, where each array
+    has 'trial', 'time' and 'data' fields. Dropped frames are under 'dropped_frames'.
+    """
+    out = {}
+    trace_path = os.path.join(block_path, 'traces')
+    if os.path.isdir(trace_path):
+        for fn in sorted(os.listdir(trace_path)):
+            name, ext = os.path.splitext(fn)
+            if ext == '.npy':
+                out[name] = _load(os.path.join(trace_path, fn))
+    dropped = os.path.join(block_path, 'dropped_frames.npy')
+    if os.path.exists(dropped):
+        out['dropped_frames'] = _load(dropped)
+    return out
+
+
+def split_trials(records):
+    # records are written in trial order, so every trial is a contiguous view
+    trials, starts = np.unique(records['trial'], return_index=True)
+    bounds = np.append(starts, records.shape[0])
+    return {int(t): records[bounds[i]:bounds[i+1]] for i, t in enumerate(trials)}
@@ -1,5 +1,3 @@
-from timeit import default_timer
-
 from pkg_resources import resource_filename
 
 from mglg.graphics.drawable import DrawableGroup
@@ -16,6 +14,7 @@ class Countdown(object):
         text_path = resource_filename('gonogo', 'resources/fonts/Baloo-Regular.ttf')
         font = FontManager.get(text_path, size=128)
         self.cam = win.cam
+        self.clock = win.clock
 
         self.texts = []
         nums = ['3', '2', '1', '!']
@@ -40,10 +39,10 @@ class Countdown(object):
             self.player.add(scale_track, 'scale', self.texts[i])
 
     def start(self):
-        self.player.start(default_timer())
+        self.player.start(self.clock())
 
     def draw(self):
-        self.player.advance(default_timer())
+        self.player.advance(self.clock())
         self.dg.draw(self.cam)
 
 
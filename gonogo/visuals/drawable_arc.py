@@ -6,6 +6,9 @@ from mglg.graphics.drawable import Drawable2D
 from mglg.math.vector import Vector4f
 from mglg.graphics.shape2d import _make_2d_indexed
 
+# unit quad (for SdfArc), as a triangle strip
+quad_vertices = np.array([[-1, -1], [1, -1], [-1, 1], [1, 1]], dtype=np.float32)
+
 # semicircle from pi to 2*pi
 # (bottom half, 'cause that's all we're using)
 
@@ -57,8 +60,7 @@ class DrawableArc(Drawable2D):
             if self._angle != self._pending_angle:
                 self.update_arc_color(self._pending_angle)
                 self._color_vbo.write(self._delta_view, offset=self._offset)
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.vao.render(mgl.LINE_STRIP)
 
     @property
@@ -134,8 +136,7 @@ class ThickDivArc(Drawable2D):
             if self._need_new_colors:  # changed the angle, need to recalculate colors
                 self._recalc_colors()
                 self._need_new_colors = False
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.vao.render(mgl.TRIANGLE_STRIP)
 
     def _recalc_vertices(self):
@@ -243,8 +244,7 @@ class ThickArc(Drawable2D):
             # do pending calc
             if self._need_recalc:
                 self._recalc_vertices()
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.shader['color'].write(self.color._ubyte_view)
             self.vao.render(mgl.TRIANGLE_STRIP_ADJACENCY)
 
@@ -299,21 +299,116 @@ class ThickArc(Drawable2D):
             self._color[:] = color
 
 
+class SdfArc(Drawable2D):
+    # Same arc as ThickDivArc (& same units), but drawn as a single quad. The fragment
+    # shader (SdfArcShader) works out the distance to the arc, so radius, thickness,
+    # angles and colors are all uniforms -- changing any of them is free, and the
+    # edges are anti-aliased at whatever size it ends up on screen.
+    # Angles are in degrees, CCW from +x (so the default is the bottom half), and
+    # `angle` (where the divider is) is relative to `start`.
+    def __init__(self, context: mgl.Context, shader, left_color=(230/255, 159/255, 0, 1),
+                 right_color=(0, 114/255, 178/255, 1), divider_color=(1, 1, 1, 1),
+                 angle=90, radius=0.5, thickness=0.1, start=180, stop=360,
+                 divider_width=0.2, *args, **kwargs):
+        super().__init__(context, shader, *args, **kwargs)
+        self.left_color = Vector4f(left_color)
+        self.right_color = Vector4f(right_color)
+        self.divider_color = Vector4f(divider_color)
+        self.angle = angle
+        self.radius = radius
+        self.thickness = thickness
+        self.start = start
+        self.stop = stop
+        self.divider_width = divider_width
+        vbo = context.buffer(quad_vertices.view(np.ubyte))
+        self.vao = context.simple_vertex_array(shader, vbo, 'vertices')
+
+    def draw(self, camera: Camera):
+        if self.visible:
+            self.update_model(camera)
+            shader = self.shader
+            outer = (self.radius + self.thickness) / 2
+            shader['extent'].value = outer * 1.05  # leave room for the anti-aliasing
+            shader['radius'].value = self.radius / 2
+            shader['thickness'].value = self.thickness
+            shader['angles'].value = np.radians(self.start), np.radians(self.stop)
+            shader['divider'].value = np.radians(self.angle)
+            shader['divider_width'].value = np.radians(self.divider_width)
+            shader['left_color'].write(self.left_color._ubyte_view)
+            shader['right_color'].write(self.right_color._ubyte_view)
+            shader['divider_color'].write(self.divider_color._ubyte_view)
+            self.vao.render(mgl.TRIANGLE_STRIP)
+
+    @property
+    def left_color(self):
+        return self._left_color
+
+    @left_color.setter
+    def left_color(self, color):
+        if isinstance(color, Vector4f):
+            self._left_color = color
+        else:
+            self._left_color[:] = color
+
+    @property
+    def right_color(self):
+        return self._right_color
+
+    @right_color.setter
+    def right_color(self, color):
+        if isinstance(color, Vector4f):
+            self._right_color = color
+        else:
+            self._right_color[:] = color
+
+    @property
+    def divider_color(self):
+        return self._divider_color
+
+    @divider_color.setter
+    def divider_color(self, color):
+        if isinstance(color, Vector4f):
+            self._divider_color = color
+        else:
+            self._divider_color[:] = color
+
+
 if __name__ == '__main__':
-    from mglg.graphics.shaders import FlatShader, VertexColorShader
+    from timeit import default_timer
+    from mglg.graphics.shaders import FlatShader, SdfArcShader, VertexColorShader
     from mglg.graphics.shape2d import Square
     from gonogo.visuals.window import ExpWindow as Win
 
     win = Win()
     flat = FlatShader(win.context)
     vcs = VertexColorShader(win.context)
+    sdf = SdfArcShader(win.context)
     # don't touch scale
     arc4 = ThickDivArc(win.context, vcs, radius=0.9, angle=90)
+    arc5 = SdfArc(win.context, sdf, radius=0.9, angle=90, position=(0, -0.1))
     sqr = Square(win.context, flat, scale=(0.0005, 2))
     sqr2 = Square(win.context, flat, scale=(2, 0.0005))
     for i in range(180):
-        #arc4.angle += 1
+        arc4.angle = arc5.angle = i
         sqr.draw(win.cam)
         sqr2.draw(win.cam)
         arc4.draw(win.cam)
+        arc5.draw(win.cam)
         win.flip()
+
+    # per-frame CPU cost when the divider moves every frame (& the radius every so often)
+    arcs = [('DrawableArc', DrawableArc(win.context, vcs)),
+            ('ThickDivArc', arc4), ('SdfArc', arc5)]
+    for name, arc in arcs:
+        times = []
+        for i in range(360):
+            t0 = default_timer()
+            arc.angle = 1 + i % 179
+            if i % 30 == 0 and hasattr(arc, 'radius'):
+                arc.radius = 0.8 + (i % 60) / 300
+            arc.draw(win.cam)
+            win.context.finish()  # include the uploads
+            times.append(default_timer() - t0)
+            win.flip()
+        print('%s: %.1f us per frame' % (name, 1e6 * np.median(times)))
+    win.close()
@@ -43,8 +43,7 @@ class FillBar(Drawable2D):
             if self._percentage != self._pending_percentage:
                 self.update_fill_color(self._pending_percentage)
                 self._color_vbo.write(self._delta_view, offset=self._offset)
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.vao.render(mgl.TRIANGLE_STRIP)
 
     @property
@@ -0,0 +1,140 @@
+from collections import deque
+from statistics import median
+from time import sleep
+
+import numpy as np
+
+# Frame timing for ExpWindow.
+# From the recent history of flips, predict when the next one will land
+# (i.e. the next vsync), and give each frame a deadline: the latest time we
+# can still do a little work (e.g. read the device) and make that flip.
+# "Late latch" callbacks are run at the deadline, right before the swap, so
+# input is sampled ~`margin` before the frame goes out (rather than a whole
+# frame earlier, before drawing). The frame's GL commands are flushed before
+# waiting, so the GPU can work on them in the meantime (otherwise it may not
+# start until the swap).
+# `margin` is the floor; how late the wait & callbacks actually finish (sleep
+# isn't precise, especially on Windows) is tracked, and the margin grows to
+# cover the worst of the recent overshoots (up to half a frame).
+# Each frame's (latch time, predicted flip, actual flip) is recorded, so the
+# gain (and the prediction error) can be checked after the fact.
+# The flips also give a running estimate of the refresh period (for when the
+# video mode doesn't tell us), and every flip-to-flip interval is kept for
+# reporting the jitter.
+
+
+class FrameScheduler(object):
+    def __init__(self, clock, frame_period=None, margin=0.002, history=120,
+                 max_records=100000, flush=None, adaptive=True):
+        self.clock = clock
+        self.frame_period = frame_period  # nominal, if known
+        self.margin = margin  # seconds before the predicted flip to run late latches
+        self.min_margin = margin
+        self.adaptive = adaptive
+        self.flush = flush  # e.g. glFlush
+        self.overshoots = deque(maxlen=history)  # how far past the deadline latching finished
+        self.flips = deque(maxlen=history)
+        self.callbacks = []
+        # (latch time, predicted flip, actual flip), one per frame
+        self.records = deque(maxlen=max_records)
+        self.intervals = deque(maxlen=max_records)  # every flip-to-flip interval
+        self.period = frame_period or 1/60.0
+        self.estimate = None  # measured period, once there are enough flips
+        self._predicted = None
+        self._latched = None
+
+    def _estimate_period(self):
+        # median of recent intervals, then again without the dropped frames
+        # (& doubled-up flips), so a bad stretch (e.g. loading) doesn't skew it
+        flips = self.flips
+        if len(flips) < 10:
+            return None
+        diffs = [b - a for a, b in zip(flips, list(flips)[1:])]
+        ref = self.frame_period or median(diffs)
+        diffs = [d for d in diffs if 0.5 * ref < d < 1.5 * ref]
+        if len(diffs) < 5:
+            return None
+        return median(diffs)
+
+    def predict(self):
+        # time of the next flip (if we start now & don't miss it)
+        if not self.flips:
+            return self.clock() + (self.frame_period or 1/60.0)
+        period = self.period
+        last = self.flips[-1]
+        missed = int((self.clock() - last) // period)  # already past some vsyncs?
+        return last + (max(missed, 0) + 1) * period
+
+    @property
+    def deadline(self):
+        return self.predict() - self.margin
+
+    def add_late_latch(self, callback):
+        self.callbacks.append(callback)
+
+    def remove_late_latch(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    def latch(self):
+        # wait for the deadline (if we're early), then run the late latches
+        predicted = self.predict()
+        deadline = predicted - self.margin
+        if self.callbacks:
+            if self.flush is not None:
+                self.flush()  # let the GPU get going while we wait
+            _wait_until(self.clock, deadline)
+            for callback in self.callbacks:
+                callback()
+            self._latched = self.clock()
+            self.overshoots.append(self._latched - deadline)
+        else:
+            self._latched = self.clock()
+        self._predicted = predicted
+
+    def flipped(self, time):
+        if self._predicted is not None:  # i.e. latch() was called this frame
+            self.records.append((self._latched, self._predicted, time))
+        if self.flips:
+            self.intervals.append(time - self.flips[-1])
+        self.flips.append(time)
+        self.estimate = self._estimate_period()
+        self.period = self.estimate or self.frame_period or 1/60.0
+        if self.adaptive and self.overshoots:
+            self.margin = min(self.min_margin + max(0.0, max(self.overshoots)),
+                              max(self.min_margin, self.period / 2))
+        self._predicted = None
+
+    def summary(self):
+        # (median prediction error, median time from latch to flip), in seconds
+        if not self.records:
+            return None
+        return (median([actual - pred for _, pred, actual in self.records]),
+                median([actual - latch for latch, _, actual in self.records]))
+
+    def jitter(self):
+        # distribution of the flip-to-flip intervals so far (in ms)
+        if len(self.intervals) < 2:
+            return None
+        ms = 1000 * np.array(self.intervals)
+        period = 1000 * self.period
+        p1, p5, p50, p95, p99 = np.percentile(ms, [1, 5, 50, 95, 99])
+        return {'n': len(ms),
+                'median': float(p50),
+                'mean': float(ms.mean()),
+                'std': float(ms.std()),
+                'min': float(ms.min()),
+                'max': float(ms.max()),
+                'percentiles': {'1': float(p1), '5': float(p5),
+                                '95': float(p95), '99': float(p99)},
+                'dropped': int(np.sum(ms > 1.5 * period))}
+
+
+def _wait_until(clock, t):
+    # sleep while there's lots of time (sleep isn't precise), then spin
+    while True:
+        remaining = t - clock()
+        if remaining <= 0:
+            return
+        if remaining > 0.002:
+            sleep(remaining - 0.0015)
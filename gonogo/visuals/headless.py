@@ -0,0 +1,178 @@
+import pyglet
+# no display on the build servers, and pyglet makes a (hidden) window
+# when pyglet.gl is first imported unless told otherwise.
+# So this needs importing before anything that pulls in pyglet.gl (e.g. imgui)
+pyglet.options['shadow_window'] = False
+pyglet.options['debug_gl'] = False
+if True:  # keep the formatter from moving these above the options
+    import os
+    from timeit import default_timer
+
+    import moderngl as mgl
+    import numpy as np
+
+    from gonogo.constants import dark_gray
+    from gonogo.utils.trace_events import tracer
+    from gonogo.visuals.frame_scheduler import FrameScheduler, _wait_until
+    from gonogo.visuals.projection import height_ortho
+    from gonogo.visuals.window import ExpWindow
+    from mglg.graphics.camera import Camera
+    from mglg.graphics.shaders import forget_context
+    from mglg.math.vector import Vector4f
+    from mglg.util.profiler import Profiler
+
+# ExpWindow without a window, for benchmarking & regression-testing scenes.
+# Draws into an offscreen framebuffer on a standalone context (set
+# MODERNGL_BACKEND=egl where moderngl supports it, otherwise run under
+# Xvfb; LIBGL_ALWAYS_SOFTWARE=1 gets llvmpipe).
+# Time comes from `clock`:
+# - a VirtualClock (the default), which flip() steps by exactly `frame_period`,
+#   so runs are deterministic & as fast as the GPU allows
+# - anything else (e.g. default_timer), in which case flip() waits for the
+#   next "vsync" like the real thing
+# With capture=True, every flip keeps a copy of the frame (see `frames`).
+
+
+class VirtualClock(object):
+    # time only moves when told to
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, dt):
+        self.time += dt
+        return self.time
+
+    def advance_to(self, time):
+        self.time = max(self.time, time)
+        return self.time
+
+
+class _NullWindow(object):
+    # stands in for the pyglet window, for the scenes that poke at it directly
+    # (e.g. imgui's renderer, hiding the mouse)
+    context = None
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def get_size(self):
+        return self.width, self.height
+
+    def get_viewport_size(self):
+        return self.width, self.height
+
+    def push_handlers(self, *args, **kwargs):
+        pass
+
+    def event(self, *args):
+        pass
+
+    def set_exclusive_mouse(self, val):
+        pass
+
+    def set_mouse_visible(self, val):
+        pass
+
+    def switch_to(self):
+        pass
+
+    def dispatch_events(self):
+        pass
+
+    def flip(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class HeadlessWindow(ExpWindow):
+    def __init__(self, width=1920, height=1080, background_color=dark_gray,
+                 clock=None, frame_period=1/60.0, capture=False, profile=False,
+                 latch_margin=0.002, **settings):
+        self._background_color = Vector4f(background_color)
+        self.clock = VirtualClock() if clock is None else clock
+        self.current_time = self.clock()
+        self.prev_time = self.current_time
+        self.scheduler = FrameScheduler(self.clock, frame_period=frame_period,
+                                        margin=latch_margin)
+        tracer.clock = self.clock
+        self._mode_period = frame_period
+        self._win = _NullWindow(width, height)
+        self.capture = capture
+        self.frames = []  # (height, width, 4) uint8 arrays, top row first
+        # `settings` go to moderngl (e.g. backend='egl')
+        if 'MODERNGL_BACKEND' in os.environ:
+            settings.setdefault('backend', os.environ['MODERNGL_BACKEND'])
+        self.context = mgl.create_standalone_context(require=330, **settings)
+        self.scheduler.flush = getattr(self.context, 'flush', None)  # (newer moderngl)
+        self.fbo = self.context.simple_framebuffer((width, height), components=4)
+        # standalone contexts have no screen, so the offscreen framebuffer stands
+        # in for it (e.g. RenderSurface2D sizes itself from & returns to the screen)
+        self.context._screen = self.fbo
+        self.fbo.use()
+        self.context.viewport = (0, 0, width, height)
+        self.context.enable(mgl.BLEND)
+        self.context.clear(*self._background_color)
+        self.profiler = Profiler(self.context).enable() if profile else None
+        self.cam = Camera(projection=height_ortho(width, height))
+
+    @property
+    def virtual(self):
+        return isinstance(self.clock, VirtualClock)
+
+    def flip(self):
+        scheduler = self.scheduler
+        predicted = scheduler.predict()
+        if self.virtual:
+            # late latches see the time they'd see on the real thing
+            self.clock.advance_to(scheduler.deadline)
+        scheduler.latch()
+        if self.virtual:
+            self.clock.advance_to(predicted)
+        else:
+            _wait_until(self.clock, predicted)
+        if self.capture:
+            self.frames.append(self.read())
+        with self.section('flip', gpu=True):
+            self.fbo.use()  # in case something forgot to put it back
+            self.context.clear(*self._background_color)
+        current_time = self.clock()
+        scheduler.flipped(current_time)
+        tracer.instant('flip', 'flips', current_time, 1000 * (current_time - self.current_time))
+        self.prev_time = self.current_time
+        self.current_time = current_time
+        if self.profiler is not None:
+            self.profiler.frame_end(self.dt)
+        return self.current_time
+
+    def read(self):
+        # what's been drawn so far this frame
+        data = self.fbo.read(components=4)
+        frame = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 4)
+        return frame[::-1].copy()  # GL's origin is bottom left
+
+    def close(self):
+        forget_context(self.context)
+        self.fbo.release()
+        self.context.release()
+
+
+if __name__ == '__main__':
+    from mglg.graphics.shaders import FlatShader
+    from mglg.graphics.shape2d import Square
+
+    win = HeadlessWindow(width=640, height=360, capture=True)
+    sqr = Square(win.context, FlatShader(win.context), scale=(0.2, 0.2),
+                 fill_color=(1, 0, 0, 1), is_outlined=False)
+    t0 = default_timer()
+    for i in range(120):
+        sqr.rotation += 3
+        sqr.draw(win.cam)
+        win.flip()
+    print('120 frames: %.1f ms (%.2f s virtual)' % (1000 * (default_timer() - t0), win.current_time))
+    print('Center pixel:', win.frames[-1][180, 320])
@@ -4,6 +4,7 @@ from pkg_resources import resource_filename
 
 from mglg.graphics.shaders import FlatShader, TextShader
 from mglg.graphics.shape2d import Square
+from mglg.graphics.shape_batch import ShapeBatch
 from mglg.graphics.text2d import Text2D, FontManager
 
 # Pictoral representation of button box
@@ -31,6 +32,9 @@ class MockButtons(object):
         self.right_key = Square(win.context, flat_shader, fill_color=(0.4, 0.4, 0.4, 1),
                                 outline_color=(1, 1, 1, 1), position=(0.64, -0.26),
                                 scale=(0.15, 0.15), is_outlined=False)
+        # draw the squares together (in this order, back to front)
+        self.squares = ShapeBatch(win.context, [self.subbase, self.base,
+                                                self.left_key, self.right_key])
 
         text_path = resource_filename('gonogo', 'resources/fonts/FreeSans.ttf')
         font = FontManager.get(text_path, size=128)
@@ -43,10 +47,7 @@ class MockButtons(object):
                                 scale=(0.06, 0.06), position=(0.64, -0.26))
 
     def draw(self, cam):
-        self.subbase.draw(cam)
-        self.base.draw(cam)
-        self.left_key.draw(cam)
-        self.right_key.draw(cam)
+        self.squares.draw(cam)
         self.left_txt.draw(cam)
         self.right_txt.draw(cam)
 
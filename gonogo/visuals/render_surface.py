@@ -1,22 +1,71 @@
+from math import ceil
+
 import moderngl as mgl
 import numpy as np
 
 from mglg.graphics.drawable import Drawable2D
 from mglg.graphics.camera import Camera
+from mglg.graphics.shaders import on_forget_context
 from gonogo.visuals.projection import height_ortho
 from mglg.math.vector import Vector4f
 
 
+# Framebuffers not currently held by a RenderSurface2D, so e.g. instruction screens
+# (which are all made up front, but only shown one at a time) can share one.
+# {(id(context), (width, height)): (context, [(texture, fbo), ...])}
+# (keeping the context, so a re-used id can't hand out a framebuffer from a
+# context that's gone)
+_fbo_pool = {}
+
+
+def _acquire(context, size):
+    entry = _fbo_pool.get((id(context), size))
+    if entry is not None and entry[0] is context and entry[1]:
+        return entry[1].pop()
+    texture = context.texture(size, 4)
+    return texture, context.framebuffer(texture)  # TODO: do we need depth attachment??
+
+
+def _release(context, texture, fbo):
+    key = id(context), texture.size
+    entry = _fbo_pool.get(key)
+    if entry is None or entry[0] is not context:
+        entry = _fbo_pool[key] = (context, [])
+    entry[1].append((texture, fbo))
+
+
+@on_forget_context
+def _forget_context(context):
+    # release the pooled framebuffers of a context that's about to be released
+    # (see mglg.graphics.shaders.forget_context)
+    for key in [k for k, v in _fbo_pool.items() if v[0] is context]:
+        for texture, fbo in _fbo_pool.pop(key)[1]:
+            fbo.release()
+            texture.release()
+
+
 class RenderSurface2D(Drawable2D):
+    # Something to render into, which is then drawn as a textured quad.
+    # The framebuffer matches the on-screen footprint (`scale`, in units of the
+    # screen height) times `quality`, and only exists from the first use() until
+    # release() (when it goes back into a shared pool).
+    # Contents are kept between frames, so if nothing changed, skip re-rendering:
+    #     if surface.dirty or something_moved:
+    #         with surface:
+    #             ...
+    #     surface.draw(cam)
     vao = None
 
-    def __init__(self, context, shader, alpha=1.0, clear_color=(0.3, 0.3, 0.3, 1.0), *args, **kwargs):
+    def __init__(self, context, shader, alpha=1.0, clear_color=(0.3, 0.3, 0.3, 1.0),
+                 quality=1.0, *args, **kwargs):
         super().__init__(context, shader, *args, **kwargs)
         self.context = context
         self.cam = Camera(projection=height_ortho(self.scale.x, self.scale.y))
-
-        self.texture = context.texture(context.screen.size, 4)
-        self.fbo = context.framebuffer(self.texture)  # TODO: do we need depth attachment??
+        self.quality = quality
+        self.texture = None
+        self.fbo = None
+        self._previous_fbo = None
+        self.dirty = True  # contents need (re-)rendering
 
         self.clear_color = Vector4f(clear_color)
         self.alpha = alpha
@@ -31,12 +80,37 @@ class RenderSurface2D(Drawable2D):
             vbo = context.buffer(vertex_texcoord.view(np.ubyte))
             self.set_vao(context, shader, vbo)
 
+    @property
+    def size(self):
+        # framebuffer size (pixels) for the current footprint
+        height = self.context.screen.size[1] * self.quality
+        return (max(1, int(ceil(self.scale[0] * height))),
+                max(1, int(ceil(self.scale[1] * height))))
+
     def use(self):
+        size = self.size
+        if self.fbo is None or self.texture.size != size:
+            self.release()
+            self.texture, self.fbo = _acquire(self.context, size)
+        self._previous_fbo = self.context.fbo
         self.fbo.clear(*self.clear_color)
         self.fbo.use()
 
     def unuse(self):
-        self.context.screen.use()
+        previous = self._previous_fbo or self.context.screen
+        self._previous_fbo = None
+        previous.use()
+        self.dirty = False
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def release(self):
+        # hand the framebuffer back to the pool (contents are lost)
+        if self.fbo is not None:
+            _release(self.context, self.texture, self.fbo)
+            self.texture, self.fbo = None, None
+        self.dirty = True
 
     def __enter__(self):
         self.use()
@@ -46,9 +120,8 @@ class RenderSurface2D(Drawable2D):
         self.unuse()
 
     def draw(self, camera: Camera):
-        if self.visible:
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+        if self.visible and self.texture is not None:
+            self.update_model(camera)
             self.shader['alpha'].value = self.alpha
             self.texture.use()
             self.vao.render(mgl.TRIANGLE_STRIP)
@@ -79,7 +152,7 @@ if __name__ == '__main__':
     flat = FlatShader(win.context)
     image = ImageShader(win.context)
 
-    render_surf = RenderSurface2D(win.context, image, alpha=0.8,
+    render_surf = RenderSurface2D(win.context, image, alpha=0.8, quality=0.5,
                                   scale=(5/6, 3/5), position=(1/4, 1/6-0.03))
 
     arrow = Arrow(win.context, flat, scale=(0.1, 0.1), fill_color=(0, 0.2, 1, 1), position=(0.4, 0.4))
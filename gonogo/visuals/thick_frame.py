@@ -26,8 +26,7 @@ class ThickFrame(Drawable2D):
 
     def draw(self, camera: Camera):
         if self.visible:
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.shader['color'].write(self.color._ubyte_view)
             self.vao.render(mgl.TRIANGLE_STRIP)
 
@@ -6,6 +6,7 @@ from pkg_resources import resource_filename
 
 from mglg.graphics.shaders import FlatShader
 from mglg.graphics.shape2d import Circle
+from mglg.graphics.shape_batch import ShapeBatch
 from mglg.graphics.object import Object2D
 from mglg.math.vector import Vector2f
 
@@ -17,8 +18,8 @@ class Traffic(object):
         self.counter = 0
         self.num = num
 
-        self.circs = []
-        #
+        # all circles go out in one (instanced) draw
+        self.circs = ShapeBatch(win.context)
         for i in range(num):
             self.circs.append(Circle(win.context, flat_shader, is_outlined=False))
 
@@ -53,8 +54,7 @@ class Traffic(object):
         self.counter += 1
 
     def draw(self, cam):
-        for i in self.circs:
-            i.draw(cam)
+        self.circs.draw(cam)
 
     @property
     def position(self):
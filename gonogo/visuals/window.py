@@ -9,9 +9,12 @@ import pyglet
 from toon.input import mono_clock
 
 from gonogo.constants import gray, dark_gray
+from gonogo.utils.trace_events import tracer
+from gonogo.visuals.frame_scheduler import FrameScheduler
 from gonogo.visuals.projection import height_ortho
 from mglg.graphics.camera import Camera
 from mglg.math.vector import Vector4f
+from mglg.util.profiler import Profiler, null_section
 
 pyglet.options['debug_gl'] = False
 
@@ -24,11 +27,35 @@ if platform.system() == 'Darwin':
 # https://stackoverflow.com/questions/31793228/osx-pushing-pixels-to-screen-with-minimum-latency
 # http://emulation.gametechwiki.com/index.php/Input_lag
 
+
+def mode_rate(screen):
+    # refresh rate (Hz) of the screen's current video mode, or None if
+    # the windowing system won't say
+    try:
+        mode = screen.get_mode()
+    except NotImplementedError:
+        return None
+    if mode is None:
+        return None
+    info = getattr(mode, 'info', None)
+    if info is not None:
+        # X11's "rate" is really the pixel clock (kHz), so work it out from the modeline
+        if not info.htotal or not info.vtotal:
+            return None
+        rate = info.dotclock * 1000.0 / (info.htotal * info.vtotal)
+    else:
+        rate = mode.rate
+    # 0 (or 1, on Windows) means "whatever the hardware default is"
+    if not rate or rate <= 1:
+        return None
+    return float(rate)
+
 # not called "Window" to avoid conflict w/ pyglet proper
 
 
 class ExpWindow(object):
-    def __init__(self, background_color=dark_gray, clock=mono_clock.get_time):
+    def __init__(self, background_color=dark_gray, clock=mono_clock.get_time,
+                 profile=False, latch_margin=0.002):
         # TODO: if committing to moderngl, make & store the context here?
         # lazy load, partially to avoid auto-formatter that wants to
         # do imports, *then* dict setting
@@ -39,6 +66,9 @@ class ExpWindow(object):
         self.clock = clock
         self.current_time = 0
         self.prev_time = 0
+        # latch_margin: minimum time (s) between running late latches & the swap
+        self.scheduler = FrameScheduler(clock, margin=latch_margin, flush=gl.glFlush)
+        tracer.clock = clock  # same clock as the device process
         # can bump down `samples` if performance is hurting
         config = gl.Config(depth_size=0, double_buffer=True,
                            alpha_size=8, sample_buffers=1,
@@ -50,13 +80,17 @@ class ExpWindow(object):
                            screen=screen, config=config,
                            style='borderless', vsync=True)
 
+        rate = mode_rate(screen)
+        self._mode_period = 1/rate if rate else None
+        self.scheduler.frame_period = self._mode_period
         self._win.event(self.on_key_press)
         atexit.register(self._on_close)
         self.context = mgl.create_context(require=int('%i%i0' % (config.major_version,
                                                                  config.minor_version)))
         self.context.viewport = (0, 0, self.width, self.height)
         self.context.enable(mgl.BLEND)
-        self.frame_period  # do this before we've drawn anything
+        # opt-in CPU/GPU timing of each frame (see mglg.util.profiler)
+        self.profiler = Profiler(self.context).enable() if profile else None
         # in principle, should be disconnected from the window
         # but we're saving time & mental energy
         self.cam = Camera(projection=height_ortho(self.width, self.height))
@@ -72,18 +106,47 @@ class ExpWindow(object):
     def flip(self):
         self._win.switch_to()
         self._win.dispatch_events()
-        self._win.flip()
-        self.context.clear(*self._background_color)
+        self.scheduler.latch()  # wait for the deadline & run late latches (if any)
+        with self.section('flip', gpu=True):
+            self._win.flip()
+            self.context.clear(*self._background_color)
         # gl.glBegin(gl.GL_POINTS)
         # gl.glColor4f(0, 0, 0, 0)
         # gl.glVertex2i(10, 10)
         # gl.glEnd()
         # gl.glFinish()  # force GL stuff to finish (but blocks CPU until then)
         current_time = self.clock()
+        self.scheduler.flipped(current_time)
+        tracer.instant('flip', 'flips', current_time, 1000 * (current_time - self.current_time))
         self.prev_time = self.current_time
         self.current_time = current_time
+        if self.profiler is not None:
+            self.profiler.frame_end(self.dt)
         return self.current_time
 
+    def section(self, name, gpu=False):
+        # `with win.section('name'):` times a chunk of the frame when profiling
+        if self.profiler is None:
+            return null_section
+        return self.profiler.section(name, gpu=gpu)
+
+    def add_late_latch(self, callback):
+        # `callback()` is run right before each swap (see FrameScheduler)
+        self.scheduler.add_late_latch(callback)
+
+    def remove_late_latch(self, callback):
+        self.scheduler.remove_late_latch(callback)
+
+    @property
+    def next_flip(self):
+        # predicted time of the next flip (i.e. when what's drawn now shows up)
+        return self.scheduler.predict()
+
+    @property
+    def deadline(self):
+        # last moment to be done with this frame
+        return self.scheduler.deadline
+
     def close(self):
         self._win.close()
 
@@ -114,25 +177,31 @@ class ExpWindow(object):
 
     @property
     def frame_period(self):
-        # get a whole-number version of the frame period
-        # very coarse and fragile, should get this from the
-        # the video mode, e.g. glfw.get_video_mode
-        if not hasattr(self, '_frame_period'):
-            possible = [60.0, 144.0]  # TODO: infer from machine...
-            vals = []
-            for _ in range(30):
-                self.flip()
-                vals.append(self.dt)
-            # chop off the first few, which are not reflective of the
-            # "real" FPS
-            avg = 1/(sum(vals[5:])/float(len(vals[5:])))
-            dff = [abs(avg - p) for p in possible]
-            fps = [v for v, d in zip(possible, dff) if d == min(dff)]
-            if not len(fps):
-                self._frame_period = 1/60.0  # default
-            else:
-                self._frame_period = 1/fps[0]
-        return self._frame_period
+        # from the video mode if we got one, refined by the measured period once
+        # there are enough flips (e.g. a mode reported as 59Hz is really 59.94Hz).
+        # If the two disagree badly (VRR, compositor weirdness), stick with the mode.
+        # Without a mode, it's the measured period (60Hz until there's enough to go on)
+        mode = self._mode_period
+        measured = self.scheduler.estimate
+        if measured is None:
+            return mode or 1/60.0
+        if mode is None or abs(measured - mode) < 0.05 * mode:
+            return measured
+        return mode
+
+    @property
+    def frame_period_source(self):
+        if self.scheduler.estimate is not None:
+            return 'mode+measured' if self._mode_period else 'measured'
+        return 'mode' if self._mode_period else 'default'
+
+    def frame_timing(self):
+        # for the settings file
+        return {'frame_period': self.frame_period,
+                'source': self.frame_period_source,
+                'mode_rate': 1/self._mode_period if self._mode_period else None,
+                'latch_margin': self.scheduler.margin,
+                'jitter_ms': self.scheduler.jitter()}
 
 
 if __name__ == '__main__':
@@ -140,11 +209,21 @@ if __name__ == '__main__':
     t0 = default_timer()
     win = ExpWindow()
     print('Init time: %4.4f' % (default_timer() - t0))
-    print('Frame period: %4.4f' % win.frame_period)
+    print('Frame period: %4.4f (%s)' % (win.frame_period, win.frame_period_source))
     while default_timer() - t0 < 3:
         win.flip()
         if win.dt > 0.026:
             print(win.dt)
+    print('Frame period: %4.4f (%s)' % (win.frame_period, win.frame_period_source))
+    print(win.frame_timing()['jitter_ms'])
+    # late latch (pretend to read a device right before each swap)
+    win.add_late_latch(lambda: None)
+    t1 = default_timer()
+    while default_timer() - t1 < 3:
+        win.flip()
+    err, lead = win.scheduler.summary()
+    print('Median flip prediction error: %.2f ms, latch to flip: %.2f ms' % (1000*err, 1000*lead))
+    win.remove_late_latch(win.scheduler.callbacks[0])
     win.background_color = (1, 0.5, 0.6, 0.1)
     while True:
         win.flip()
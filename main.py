@@ -35,6 +35,7 @@ if __name__ == '__main__':
     from hashlib import md5
     import platform
     import json
+    import signal
     import hid
     from datetime import datetime
     from serial.tools import list_ports
@@ -44,7 +45,7 @@ if __name__ == '__main__':
     from gonogo.visuals.window import ExpWindow as Window
     from gonogo.scenes.loading import Loading
     from gonogo.settings.block_handler import BlockHandler
-    from gonogo.settings.resolve import resolve_settings
+    from gonogo.settings.plan import load_plan
     # must import implemented blocks here
     from gonogo.scenes import *
     from gonogo.utils import camel_to_snake, snake_to_camel, rush
@@ -59,9 +60,15 @@ if __name__ == '__main__':
     # first, we'll get a window + context up ASAP
     # this takes a certain amount of time (~750-1000ms)
     freeze_support()  # TODO: can this just live somewhere in toon?
+    # turn SIGTERM into a normal exit, so atexit handlers run
+    # (e.g. pending trial data gets written, see gonogo/utils/data_writer.py)
+    def on_sigterm(signum, frame):
+        raise SystemExit(1)
+    signal.signal(signal.SIGTERM, on_sigterm)
     can_rush = rush(True)  # test if rush will have an effect
     rush(False)
-    win = Window()
+    # `--profile` to time every frame (see block*/frame_timing.json)
+    win = Window(profile='--profile' in sys.argv)
 
     # instantiate the device
     hids = any([e['vendor_id'] == 0x16c0 for e in hid.enumerate()])
@@ -121,7 +128,8 @@ if __name__ == '__main__':
         'os': platform.platform(),
         'py_version': platform.python_version(),
         'rush_allowed': can_rush,
-        'fps': int(1/win.frame_period),
+        'fps': round(1/win.frame_period, 2),
+        'frame_timing': win.frame_timing(),
         'gpu': win.context.info['GL_RENDERER'],
         'device': device_type,
         'language': user_settings['spanish'],
@@ -135,7 +143,8 @@ if __name__ == '__main__':
     default_recipes = os.path.join(user_settings['recipe_dir'], 'defaults/')
     # resolved is the proto-block-handler, resolved_dict is the plain list of
     # dictionaries that can be re-saved to a file somewhere
-    bh_material, resolved_dict = resolve_settings(user_settings['recipe'], default_recipes)
+    # (compiled once and cached, see gonogo/settings/plan.py)
+    bh_material, resolved_dict = load_plan(user_settings['recipe'], default_recipes)
 
     # part 2: usable block_handlers
     block_handlers = [BlockHandler(x, y) for x, y in zip(bh_material, resolved_dict)]
@@ -1,8 +1,67 @@
+import weakref
+
 import numpy as np
 
 # TODO: not very useful right now, but could be moveable in the future
 
+# uniform block binding point for the `Camera` block in the shaders
+# (see mglg.graphics.shaders)
+CAMERA_BINDING = 0
+
 
 class Camera(object):
+    # camera currently bound to CAMERA_BINDING, per context:
+    # {id(context): (context, camera)} (contexts aren't hashable, and keeping the
+    # context means a re-used id isn't mistaken for the old context)
+    _bound = {}
+    _cameras = weakref.WeakSet()  # for forget_context
+
     def __init__(self, view=np.eye(4, dtype=np.float32), projection=None):
+        self.version = 0  # bumped whenever vp is set
         self.vp = np.dot(view, projection).astype(np.float32)
+        # buffers belong to a context, so one per context the camera is used on:
+        # {id(context): [context, ubo, version written]}
+        self._ubos = {}
+        Camera._cameras.add(self)
+
+    @property
+    def vp(self):
+        return self._vp
+
+    @vp.setter
+    def vp(self, value):
+        # assign a new matrix rather than modifying in place, so that the version updates
+        self._vp = np.ascontiguousarray(value, dtype=np.float32)
+        self.version += 1
+
+    def use(self, context):
+        # make this the camera for subsequent draws. The view-projection matrix
+        # lives in a uniform buffer shared by all programs, so this only costs
+        # anything when the camera changes (or we switch cameras, e.g. for a RenderSurface2D)
+        key = id(context)
+        entry = self._ubos.get(key)
+        if entry is None or entry[0] is not context:
+            ubo = context.buffer(reserve=self._vp.nbytes, dynamic=True)
+            entry = self._ubos[key] = [context, ubo, None]
+        ubo = entry[1]
+        if entry[2] != self.version:
+            ubo.write(self._vp.view(np.ubyte))
+            entry[2] = self.version
+        bound = Camera._bound.get(key)
+        if bound is None or bound[0] is not context or bound[1] is not self:
+            ubo.bind_to_uniform_block(CAMERA_BINDING)
+            Camera._bound[key] = (context, self)
+
+
+def forget_context(context):
+    # drop the buffers & binding for a context that's about to be released
+    # (see mglg.graphics.shaders.forget_context, which calls this)
+    key = id(context)
+    bound = Camera._bound.get(key)
+    if bound is not None and bound[0] is context:
+        del Camera._bound[key]
+    for cam in list(Camera._cameras):
+        entry = cam._ubos.get(key)
+        if entry is not None and entry[0] is context:
+            del cam._ubos[key]
+            entry[1].release()
@@ -1,4 +1,5 @@
 import abc
+from itertools import count
 import numpy as np
 from mglg.graphics.object import Object2D
 from mglg.graphics.camera import Camera
@@ -6,21 +7,32 @@ from moderngl import Context, Program
 
 
 class Drawable(abc.ABC):
+    _ids = count()  # unique per drawable (unlike id(), never re-used)
+
     def __init__(self, context: Context, shader: Program, visible=True, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.context = context
         self.visible = visible
         self.shader = shader
-        self.mvp = np.eye(4, dtype=np.float32)
-        self._mvp_ubyte_view = self.mvp.view(np.ubyte)  # use this one for sending to moderngl
+        self._draw_id = next(Drawable._ids)
+
+    def update_model(self, camera: Camera, program: Program = None):
+        # bind the camera's view-projection buffer, and send our model matrix
+        # (the shaders do vp * model). Programs are shared between drawables,
+        # so we only skip the write if we were the last to send this exact matrix
+        camera.use(self.context)
+        program = self.shader if program is None else program
+        mm = self.model_matrix  # cached, see Object2D
+        state = (self._draw_id, self.mm_version)
+        if program.extra != state:
+            program['model'].write(mm.view(np.ubyte))
+            program.extra = state
 
     @abc.abstractmethod
     def draw(self, camera: Camera):
         pass
         # if self.visible:
-        #     # it seems like @ is ~1.5x slower than dot for this sort of problem,
-        #     # though the absolute difference is 1.83 us vs 1.18 us
-        #     np.dot(self.model_matrix, camera.vp, self.mvp)
-        #     self.shader['mvp'].write(self._mvp_ubyte_view)
+        #     self.update_model(camera)
         #     self.vao.render() and the like
 
 
@@ -2,27 +2,64 @@
 # Copyright (c) 2009-2016 Nicolas P. Rougier. All rights reserved.
 # Distributed under the (new) BSD License.
 # -----------------------------------------------------------------------------
+import atexit
+import os
 import numpy as np
 from . glyph import Glyph
+from mglg.util.cache import atomic_save, cache_dir, file_hash
 import freetype
 
+# Rasterised glyphs (bitmaps, metrics & kerning) are cached on disk per font
+# file (by content hash) & size, so usually freetype is only needed for glyphs
+# we've never seen before. Anything new gets written back at exit.
+CACHE_VERSION = 1
+_unsaved = set()
+
+
+def _save_all():
+    for font in list(_unsaved):
+        try:
+            font.save_cache()
+        except OSError:
+            pass
+
+
+atexit.register(_save_all)
+
 
 class AggFont(object):
 
-    def __init__(self, filename, size, atlas):
+    def __init__(self, filename, size, atlas, use_cache=True):
 
         self.filename = filename
         self.atlas = atlas
         self.size = size
         self.glyphs = {}
-        face = freetype.Face(self.filename)
-        face.set_char_size(int(size*64))
-        metrics = face.size
-        self.ascender = metrics.ascender/64.0
-        self.descender = metrics.descender/64.0
-        self.height = metrics.height/64.0
+        self._face = None
+        self._bitmaps = {}  # charcode: (h, w, 3) pixels, kept around for the cache
+        self.cache_name = None
+        if use_cache:
+            name = '%s_%i_v%i.npz' % (file_hash(filename)[:16], size, CACHE_VERSION)
+            try:
+                self.cache_name = os.path.join(cache_dir('fonts'), name)
+            except OSError:  # e.g. read-only home, same as use_cache=False
+                pass
+        if not self._load_cache():
+            face = self.face
+            face.set_char_size(int(size*64))
+            metrics = face.size
+            self.ascender = metrics.ascender/64.0
+            self.descender = metrics.descender/64.0
+            self.height = metrics.height/64.0
         self.linegap = (self.height - self.ascender + self.descender)
 
+    @property
+    def face(self):
+        # only touch freetype if we need to
+        if self._face is None:
+            self._face = freetype.Face(self.filename)
+        return self._face
+
     def __getitem__(self, charcode):
         if charcode not in self.glyphs.keys():
             self.load('%c' % charcode)
@@ -38,18 +75,20 @@ class AggFont(object):
         charcodes: [str | unicode]
             Set of characters to be represented
         '''
-        face = freetype.Face(self.filename)
+        charcodes = [c for c in dict.fromkeys(charcodes) if c not in self.glyphs.keys()]
+        if not charcodes:
+            return
+        face = self.face
         pen = freetype.Vector(0, 0)
         hres = 100*72
         hscale = 1.0/100
 
+        rasterised = []
         for charcode in charcodes:
             face.set_char_size(int(self.size * 64), 0, hres, 72)
             matrix = freetype.Matrix(int((hscale) * 0x10000), int((0.0) * 0x10000),
                                      int((0.0) * 0x10000), int((1.0) * 0x10000))
             face.set_transform(matrix, pen)
-            if charcode in self.glyphs.keys():
-                continue
             # ??? why doesn't the linter find these?
             flags = freetype.FT_LOAD_RENDER | freetype.FT_LOAD_FORCE_AUTOHINT
             flags |= freetype.FT_LOAD_TARGET_LCD
@@ -64,44 +103,101 @@ class AggFont(object):
 
             w = int(width//3)
             h = rows
-            # h+1,w+1 to have a black border
-            region = self.atlas.allocate((h+1, w+1))
+            # copy the whole bitmap at once (rows are `pitch` apart)
+            data = np.array(bitmap.buffer, dtype=np.ubyte).reshape(rows, pitch)[:, :w*3]
+            data = data.reshape(h, w, 3)
+
+            offset = left, top
+            advance = face.glyph.advance.x, face.glyph.advance.y
+            rasterised.append((charcode, data, offset, advance))
+
+        # pack the whole lot at once
+        new_glyphs = self._add_glyphs(rasterised)
+
+        # Generate kerning (if the font has any)
+        if face.has_kerning:
+            for glyph in new_glyphs:
+                charcode = glyph.charcode
+                for g in self.glyphs.values():
+                    # 64 * 64 because of 26.6 encoding AND the transform matrix used
+                    # in texture_font_load_face (hres = 64)
+                    kerning = face.get_kerning(g.charcode, charcode,
+                                               mode=freetype.FT_KERNING_UNFITTED)
+                    if kerning.x != 0:
+                        glyph.kerning[g.charcode] = kerning.x/(64.0*64.0)
+                    kerning = face.get_kerning(charcode, g.charcode,
+                                               mode=freetype.FT_KERNING_UNFITTED)
+                    if kerning.x != 0:
+                        g.kerning[charcode] = kerning.x/(64.0*64.0)
+        if new_glyphs and self.cache_name is not None:
+            _unsaved.add(self)
+
+    def _add_glyphs(self, items):
+        # put the pixels in the atlas & make the glyphs
+        # items are (charcode, (h, w, 3) pixels, offset, advance)
+        # h+1,w+1 to have a black border
+        regions = self.atlas.allocate_many([(data.shape[0]+1, data.shape[1]+1)
+                                            for _, data, _, _ in items])
+        glyphs = []
+        for (charcode, data, offset, advance), region in zip(items, regions):
             if region is None:
                 print("Cannot store glyph '%c'" % charcode)
                 continue
 
+            h, w = data.shape[0:2]
             x, y, _, _ = region
             # sould be y+h+1,x+w+1 but we skip the black border
+            self.atlas[y:y+h, x:x+w] = data
+            self.atlas.mark_dirty((x, y, w, h))
+            self._bitmaps[charcode] = data
 
-            texture = self.atlas[y:y+h, x:x+w]
-            data = []
-            for i in range(rows):
-                data.extend(bitmap.buffer[i*pitch:i*pitch+width])
-            data = np.array(data, dtype=np.ubyte).reshape(h, w, 3)
-            texture[...] = data
-
-            # Build glyph
-            size = w, h
-            offset = left, top
-            advance = face.glyph.advance.x, face.glyph.advance.y
-
-            u0 = (x + 0.0)/float(self.atlas.shape[0])
-            v0 = (y + 0.0)/float(self.atlas.shape[1])
-            u1 = (x + w - 0.0)/float(self.atlas.shape[0])
-            v1 = (y + h - 0.0)/float(self.atlas.shape[1])
-            texcoords = (u0, v0, u1, v1)
-            glyph = Glyph(charcode, size, offset, advance, texcoords)
+            # in pixels (the shader normalizes), so they survive the atlas growing
+            texcoords = (x, y, x + w, y + h)
+            glyph = Glyph(charcode, (w, h), offset, advance, texcoords)
             self.glyphs[charcode] = glyph
-
-            # Generate kerning
-            for g in self.glyphs.values():
-                # 64 * 64 because of 26.6 encoding AND the transform matrix used
-                # in texture_font_load_face (hres = 64)
-                kerning = face.get_kerning(g.charcode, charcode,
-                                           mode=freetype.FT_KERNING_UNFITTED)
-                if kerning.x != 0:
-                    glyph.kerning[g.charcode] = kerning.x/(64.0*64.0)
-                kerning = face.get_kerning(charcode, g.charcode,
-                                           mode=freetype.FT_KERNING_UNFITTED)
-                if kerning.x != 0:
-                    g.kerning[charcode] = kerning.x/(64.0*64.0)
+            glyphs.append(glyph)
+        return glyphs
+
+    def _load_cache(self):
+        if self.cache_name is None or not os.path.exists(self.cache_name):
+            return False
+        try:
+            with np.load(self.cache_name) as cache:
+                cache = dict(cache)  # one read
+        except (OSError, ValueError):  # corrupt, so ignore (and overwrite later)
+            return False
+        self.ascender, self.descender, self.height = cache['metrics'].tolist()
+        pixels = cache['pixels']
+        items = []
+        for code, (w, h), offset, advance, start in zip(cache['chars'], cache['shapes'],
+                                                      cache['offsets'], cache['advances'],
+                                                      cache['starts']):
+            data = pixels[start:start + h*w*3].reshape(h, w, 3)
+            items.append((chr(code), data, tuple(offset.tolist()), tuple(advance.tolist())))
+        self._add_glyphs(items)
+        for (left, right), value in zip(cache['kern_pairs'], cache['kern_values']):
+            left, right = chr(left), chr(right)
+            if left in self.glyphs and right in self.glyphs:
+                self.glyphs[right].kerning[left] = float(value)
+        return True
+
+    def save_cache(self):
+        _unsaved.discard(self)
+        if self.cache_name is None:
+            return
+        chars = list(self._bitmaps.keys())
+        glyphs = [self.glyphs[c] for c in chars]
+        bitmaps = [self._bitmaps[c].ravel() for c in chars]
+        sizes = [b.size for b in bitmaps]
+        kerning = [(ord(left), ord(g.charcode), value) for g in glyphs
+                   for left, value in g.kerning.items()]
+        atomic_save(self.cache_name, np.savez,
+                    metrics=np.array([self.ascender, self.descender, self.height]),
+                    chars=np.array([ord(c) for c in chars], dtype=np.int32),
+                    shapes=np.array([g.shape for g in glyphs], dtype=np.int32).reshape(-1, 2),
+                    offsets=np.array([g.offset for g in glyphs], dtype=np.int32).reshape(-1, 2),
+                    advances=np.array([g.advance for g in glyphs], dtype=np.int64).reshape(-1, 2),
+                    starts=(np.cumsum(sizes) - sizes).astype(np.int64),
+                    pixels=np.concatenate(bitmaps) if bitmaps else np.zeros(0, np.ubyte),
+                    kern_pairs=np.array([k[:2] for k in kerning], dtype=np.int32).reshape(-1, 2),
+                    kern_values=np.array([k[2] for k in kerning], dtype=np.float64))
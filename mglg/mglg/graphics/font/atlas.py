@@ -7,46 +7,89 @@
 A Texture atlas allows to group multiple small data regions into a larger
 texture.
 
-The algorithm is based on the article by Jukka Jylänki : "A Thousand Ways
-to Pack the Bin - A Practical Approach to Two-Dimensional Rectangle Bin
-Packing", February 27, 2010. More precisely, this is an implementation of
-the Skyline Bottom-Left algorithm based on C++ sources provided by Jukka
-Jylänki at: http://clb.demon.fi/files/RectangleBinPack/
+Regions are packed on shelves (rows of fixed height, filled left to right).
+Shelves are bucketed by height class, so finding room for a glyph only looks
+at the open shelf of its class rather than scanning a skyline. When the atlas
+is full it grows downwards (rows are appended), so regions that were already
+handed out keep their pixel coordinates.
 
 Example usage:
 --------------
+    atlas = Atlas(1024, 1024)
+    x, y, w, h = atlas.allocate((20, 10))
+    atlas[y:y+h, x:x+w] = data
+    atlas.mark_dirty((x, y, w, h))
 """
-import sys
+from timeit import default_timer
 import numpy as np
 
 
-class Atlas(np.ndarray):
+class Atlas(object):
     """ Texture Atlas (two dimensional)
 
     Parameters
 
-    data : ndarray
-        Texture data (optional)
+    width, height : int
+        Initial size of the atlas, in pixels
 
-    shape : tuple of integers
-        Texture shape (optional)
+    depth : int
+        Number of channels
 
-    dtype : dtype
-        Texture data type (optional)
+    max_height : int
+        The atlas doubles in height when full, up to this size
+        (keep it within GL_MAX_TEXTURE_SIZE)
 
-    store : bool
-        Specify whether this object stores a reference to the data,
-        allowing the data to be updated regardless of striding. Note
-        that modifying the data after passing it here might result in
-        undesired behavior, unless a copy is given. Default True.
-
-    format : ENUM
-        The format of the texture: GL_LUMINANCE, ALPHA, GL_LUMINANCE_ALPHA,
-        or GL_RGB, GL_RGBA. If not given the format is chosen automatically
-        based on the number of channels. When the data has one channel,
-        GL_LUMINANCE is assumed.
+    granularity : int
+        Shelf heights are rounded up to a multiple of this
     """
 
+    def __init__(self, width=1024, height=1024, depth=3, max_height=8192,
+                 granularity=4):
+        self.data = np.zeros((height, width, depth), np.ubyte)
+        self.max_height = max_height
+        self.granularity = granularity
+        self.dirty = []  # (x, y, width, height) written since creation
+        self.version = 0  # bumped whenever `data` is reallocated
+        self.used = 0  # pixels handed out
+        self.pack_time = 0  # seconds spent in allocate()
+        self.top = 0  # first row that doesn't belong to a shelf
+        self._shelves = {}  # height class: [y, x of free space]
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def width(self):
+        return self.data.shape[1]
+
+    @property
+    def height(self):
+        return self.data.shape[0]
+
+    @property
+    def fill_ratio(self):
+        return self.used / float(self.width * self.height)
+
+    def stats(self):
+        return {'size': (self.width, self.height),
+                'fill_ratio': self.fill_ratio,
+                'shelf_ratio': self.top / float(self.height),
+                'pack_time': self.pack_time}
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def mark_dirty(self, region):
+        """
+        Record that a region (x, y, width, height) was written to, so that
+        textures made from this atlas can upload just that part.
+        """
+        self.dirty.append(region)
+
     def allocate(self, shape):
         """
         Allocate a new region of given shape.
@@ -59,103 +102,56 @@ class Atlas(np.ndarray):
 
         Return
         ------
-            Texture2D or None
+            (x, y, width, height) or None
         """
-        if not hasattr(self, 'nodes'):
-            self.nodes = [(0, 0, self.shape[0]), ]
-            self.used = 0
-
-        height, width = shape
-        best_height = sys.maxsize
-        best_index = -1
-        best_width = sys.maxsize
-        region = 0, 0, width, height
-
-        for i in range(len(self.nodes)):
-            y = self._fit(i, width, height)
-            if y >= 0:
-                node = self.nodes[i]
-                if (y+height < best_height or
-                        (y+height == best_height and node[2] < best_width)):
-                    best_height = y+height
-                    best_index = i
-                    best_width = node[2]
-                    region = node[0], y, width, height
-
-        if best_index == -1:
-            print("No enough free space in atlas")
-            return None
-
-        node = region[0], region[1]+height, width
-        self.nodes.insert(best_index, node)
-
-        i = best_index+1
-        while i < len(self.nodes):
-            node = self.nodes[i]
-            prev_node = self.nodes[i-1]
-            if node[0] < prev_node[0]+prev_node[2]:
-                shrink = prev_node[0]+prev_node[2] - node[0]
-                x, y, w = self.nodes[i]
-                self.nodes[i] = x+shrink, y, w-shrink
-                if self.nodes[i][2] <= 0:
-                    del self.nodes[i]
-                    i -= 1
-                else:
-                    break
-            else:
-                break
-            i += 1
-
-        self._merge()
-        self.used += width*height
-        x, y, width, height = region
+        t0 = default_timer()
+        region = self._allocate(shape)
+        self.pack_time += default_timer() - t0
         return region
-        # return self[y:y+height, x:x+width]
-        # return self[x:x+width, y:y+height]
 
-    def _fit(self, index, width, height):
+    def allocate_many(self, shapes):
         """
-        Test if region (width,height) fit into self.nodes[index]
-
-        Parameters
-        ----------
-
-        index : int
-            Index of the internal node to be tested
+        Allocate regions for many shapes at once (e.g. pre-warming a whole charset).
+        Packing tallest-first wastes less space than packing in arrival order.
 
-        width : int
-            Width or the region to be tested
-
-        height : int
-            Height or the region to be tested
+        Return
+        ------
+            list of (x, y, width, height) or None, in the order of `shapes`
         """
-
-        node = self.nodes[index]
-        x, y = node[0], node[1]
-        width_left = width
-
-        if x+width > self.shape[0]:
-            return -1
-
-        i = index
-        while width_left > 0:
-            node = self.nodes[i]
-            y = max(y, node[1])
-            if y+height > self.shape[1]:
-                return -1
-            width_left -= node[2]
-            i += 1
-        return y
-
-    def _merge(self):
-        """ Merge nodes. """
-
-        i = 0
-        while i < len(self.nodes)-1:
-            node = self.nodes[i]
-            next_node = self.nodes[i+1]
-            if node[1] == next_node[1]:
-                self.nodes[i] = node[0], node[1], node[2]+next_node[2]
-                del self.nodes[i+1]
-            else:
-                i += 1
+        t0 = default_timer()
+        regions = [None] * len(shapes)
+        for i in sorted(range(len(shapes)), key=lambda i: -shapes[i][0]):
+            regions[i] = self._allocate(shapes[i])
+        self.pack_time += default_timer() - t0
+        return regions
+
+    def _allocate(self, shape):
+        height, width = shape
+        if width > self.width:
+            print("Region is wider than the atlas")
+            return None
+        g = self.granularity
+        key = -(-height // g) * g  # height class
+        shelf = self._shelves.get(key)
+        if shelf is None or shelf[1] + width > self.width:
+            # open a new shelf for this class (the old one is abandoned)
+            while self.top + key > self.height:
+                if not self._grow():
+                    print("No enough free space in atlas")
+                    return None
+            shelf = self._shelves[key] = [self.top, 0]
+            self.top += key
+        y, x = shelf
+        shelf[1] += width
+        self.used += width*height
+        return x, y, width, height
+
+    def _grow(self):
+        height = self.height
+        if height >= self.max_height:
+            return False
+        data = np.zeros((min(2*height, self.max_height),) + self.data.shape[1:], np.ubyte)
+        data[:height] = self.data
+        self.data = data
+        self.version += 1
+        return True
@@ -4,10 +4,13 @@
 # -----------------------------------------------------------------------------
 """ Font Manager """
 import os
-import numpy as np
 from . atlas import Atlas
 #from glumpy.gloo.atlas import Atlas
 from . agg_font import AggFont
+from mglg.graphics.shaders import on_forget_context
+
+# printable ASCII + Latin-1 supplement (enough for e.g. Spanish instructions)
+LATIN_1 = ''.join(map(chr, list(range(32, 127)) + list(range(160, 256))))
 
 
 class FontManager(object):
@@ -24,6 +27,12 @@ class FontManager(object):
     # Font cache
     _cache_agg = {}
 
+    # GPU copies of the atlas, one per context (keyed by id, as contexts aren't hashable)
+    # as [context, texture, number of dirty regions already uploaded, atlas version]
+    # (keeping the context, so a re-used id can't hand out a texture from a context
+    # that's gone)
+    _textures = {}
+
     # The singleton instance
     _instance = None
 
@@ -33,28 +42,71 @@ class FontManager(object):
         return cls._instance
 
     @classmethod
-    def get(cls, filename, size=12):
+    def get(cls, filename, size=12, charset=None):
         """
         Get a font from the cache, the local data directory or the distant server
         (in that order).
+
+        If given, all of `charset` (e.g. LATIN_1) is rasterised & packed up front,
+        rather than glyph-by-glyph as text is made.
         """
 
         basename = os.path.basename(filename)
 
         key = '%s-%d' % (basename, size)
-        if FontManager._atlas_agg is None:
-            # interesting that agg atlas is RGB?
-            FontManager._atlas_agg = np.zeros((1024, 1024, 3), np.ubyte).view(Atlas)
-
-        atlas = FontManager._atlas_agg
+        atlas = cls().atlas_agg
         cache = FontManager._cache_agg
         if key not in cache.keys():
             # AggFont does the actual loading
             cache[key] = AggFont(filename, size, atlas)
+        if charset:
+            cache[key].load(charset)
         return cache[key]
 
+    @classmethod
+    def texture(cls, context):
+        """
+        Get the (shared) atlas texture for a context, first uploading
+        any glyphs that have been added since the last call.
+        """
+        atlas = cls().atlas_agg
+        dirty = atlas.dirty
+        key = id(context)
+        entry = cls._textures.get(key)
+        if entry is not None and entry[0] is not context:
+            entry = None
+        if entry is not None and entry[3] != atlas.version:
+            # the atlas grew, so start over with a bigger texture
+            entry[1].release()
+            entry = None
+        if entry is None:
+            texture = context.texture((atlas.width, atlas.height), atlas.shape[2],
+                                      atlas.data, alignment=1)
+            entry = cls._textures[key] = [context, texture, len(dirty), atlas.version]
+        _, texture, done, _ = entry
+        for x, y, w, h in dirty[done:]:
+            texture.write(atlas[y:y+h, x:x+w].copy(), viewport=(x, y, w, h), alignment=1)
+        entry[2] = len(dirty)
+        return texture
+
+    @classmethod
+    def forget_context(cls, context):
+        """
+        Release the atlas texture for a context that's about to be released
+        (see mglg.graphics.shaders.forget_context).
+        """
+        key = id(context)
+        entry = cls._textures.get(key)
+        if entry is not None and entry[0] is context:
+            del cls._textures[key]
+            entry[1].release()
+
     @property
     def atlas_agg(self):
         if FontManager._atlas_agg is None:
-            FontManager._atlas_agg = np.zeros((1024, 1024, 3), np.ubyte).view(Atlas)
+            # interesting that agg atlas is RGB?
+            FontManager._atlas_agg = Atlas(1024, 1024, 3)
         return FontManager._atlas_agg
+
+
+on_forget_context(FontManager.forget_context)
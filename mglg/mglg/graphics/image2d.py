@@ -36,8 +36,7 @@ class Image2D(Drawable2D):
 
     def draw(self, camera: Camera):
         if self.visible:
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.texture.use()
             self.shader['alpha'].value = self.alpha
             self.vao.render(mgl.TRIANGLE_STRIP)
@@ -5,6 +5,9 @@ from mglg.math.vector import Vector2f
 
 class Object2D(object):
     def __init__(self, position=(0, 0), rotation=0, scale=(1, 1), *args, **kwargs):
+        # (position, rotation, scale) the model matrix was made from
+        self._mm_state = None
+        self.mm_version = 0  # bumped whenever the model matrix actually changes
         self.position = Vector2f(position)
         self.rotation = rotation
         self.scale = Vector2f(scale)
@@ -12,10 +15,15 @@ class Object2D(object):
 
     @property
     def model_matrix(self):
-        # TODO: any caching?
-        mm = self._model_matrix
-        make_2d_mm(self.position, self.rotation, self.scale, mm)
-        return mm
+        # only rebuild if the position, rotation, or scale changed (most things
+        # never move). Compares contents, so any kind of write counts (setters,
+        # swizzles, indexing, np.copyto, ...)
+        state = (self._position.tobytes(), self._rotation, self._scale.tobytes())
+        if state != self._mm_state:
+            make_2d_mm(self._position, self._rotation, self._scale, self._model_matrix)
+            self._mm_state = state
+            self.mm_version += 1
+        return self._model_matrix
 
     @property
     def position(self):
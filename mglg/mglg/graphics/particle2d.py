@@ -1,4 +1,5 @@
 # https://github.com/moderngl/moderngl/blob/master/examples/particle_system.py
+from timeit import default_timer
 import numpy as np
 import moderngl as mgl
 from mglg.graphics.camera import Camera
@@ -10,25 +11,27 @@ def random_on_circle(radius, size):
     theta = np.random.uniform(0, 2*np.pi, size=size)
     return r, theta
 
-# TODO: GL_STREAM_COPY?
 
+# the burst was originally tuned per-frame at 60Hz, so velocities etc. are
+# converted from "per frame" to "per second" with this
+REFERENCE_RATE = 60.0
 
-class ParticleBurst2D(Drawable2D):
-    # make sure to set scale in the init, else the initial particle positiions will
-    # be pretty wild...
+# Buffer sets, shared between bursts with the same (context, shader, size, radius).
+# A burst claims a set on reset(), and only hangs on to it while it's visible,
+# so e.g. each block can have its own burst without each allocating buffers.
+# {(id(context), id(shader), num_particles, radius): [_ParticleSet, ...]}
+_pool = {}
 
-    # three buffers-- one for the initial state,
-    # two for doing computation
-    # one buffer for static things (size, color)
-    # I think this sort of thing is called "transform feedback"
-    def __init__(self, context: mgl.Context, shader,
-                 num_particles=1e5, *args, **kwargs):
-        super().__init__(context, shader, *args, **kwargs)
-        self.context = context  # we need to keep a reference to the shader around
-        # for copying buffers & whatnot
-        self._tracker = 1.0
-        num_particles = int(num_particles)
-        self.num_particles = num_particles
+
+class _ParticleSet(object):
+    # five buffers:
+    # - two for the state (position/alpha & velocity), which take turns
+    #   being the input & output of transform feedback (ping-pong, no copies)
+    # - the original state, which we use to "reset" the explosion
+    #   without writing new data to the GPU
+    # - static per-particle acceleration & fade, and color & size
+    def __init__(self, context, shader, num_particles, radius):
+        self.owner = None
         color_size = np.zeros(num_particles, dtype=[('color_size', np.float32, 4)])
         # first three elements are RGB, last one is particle (i.e. GL_POINT) size
         # this is static, and we don't need to do any extra computations
@@ -37,62 +40,107 @@ class ParticleBurst2D(Drawable2D):
         color_size['color_size'][:, 2] = np.random.uniform(0.0, 0.1, num_particles)
         color_size['color_size'][:, 3] = np.random.uniform(0.1, 4.0, num_particles)
 
-        # first three elements are vertex XYZ, last one is alpha
-        # think about this-- should we just delay until ready to draw the first time?
-        # if the scale isn't set immediately, then end up with garbage?
-        pos_alpha = np.zeros(num_particles, dtype=[('vertices_alpha', np.float32, 8)])
-        r, theta = random_on_circle(self.scale.y * 0.2, num_particles)
-        pos_alpha['vertices_alpha'][:, 0:2] = np.array([np.cos(theta) * r, np.sin(theta) * r]).T
-        pos_alpha['vertices_alpha'][:, 3] = np.random.uniform(0.5, 1.0, num_particles)
-        # it looks like the moderngl example allocates 2x the amount, so the first 4
-        # are from the current timestep and the last 4 are from the previous timestep
-        # then during rendering, the previous timestep is ignored (treated as padding)
-
-        r_accel, theta_accel = random_on_circle(0.08, self.num_particles)
+        # first three elements are vertex XYZ, fourth is alpha, last four are velocity
+        # (start moving outwards, at a speed proportional to the distance from the center)
+        state = np.zeros(num_particles, dtype=[('pos_alpha', np.float32, 4),
+                                               ('velocity', np.float32, 4)])
+        r, theta = random_on_circle(radius, num_particles)
+        pos = np.array([np.cos(theta) * r, np.sin(theta) * r]).T
+        state['pos_alpha'][:, 0:2] = pos
+        state['pos_alpha'][:, 3] = np.random.uniform(0.5, 1.0, num_particles)
+        state['velocity'][:, 0:2] = pos * REFERENCE_RATE
 
+        # xy is acceleration, z is how fast alpha fades (both per second)
+        r_accel, theta_accel = random_on_circle(0.08, num_particles)
         accel = np.zeros(num_particles, dtype=[('accel', np.float32, 4)])
-        accel['accel'][:, :2] = np.array([r_accel * np.cos(theta_accel),
-                                          r_accel * np.sin(theta_accel)]).T
-        accel = context.buffer(accel.view(np.ubyte))
-        # vbo_render is what ends up being rendered
-        # vbo_trans is an intermediary for transform feedback
-        # vbo_orig is the original state, which we use to "reset" the explosion
-        # without writing new data to the GPU
-        color_size2 = context.buffer(color_size.view(np.ubyte))
-        self.vbo_render = context.buffer(pos_alpha.view(np.ubyte))
-        self.vbo_trans = context.buffer(reserve=self.vbo_render.size)
-        self.vbo_orig = context.buffer(reserve=self.vbo_render.size)
-
-        self.vao_trans = context.vertex_array(shader.transform,
-                                              [
-                                                  (self.vbo_render, '4f 4f', 'in_pos_alpha', 'in_prev_pos_alpha'),
-                                                  (accel, '4f', 'accel')
-                                              ])
-        # self.vao_trans = context.simple_vertex_array(..., self.vbo_trans, ???)
-        self.vao_render = context.vertex_array(shader.render,
-                                               [
-                                                   (self.vbo_render, '4f 4x4', 'vertices_alpha'),
-                                                   (color_size2, '4f', 'color_size')
-                                               ])
-        # set the data of the original state
-        context.copy_buffer(self.vbo_orig, self.vbo_render)
+        accel['accel'][:, 0] = r_accel * np.cos(theta_accel)
+        accel['accel'][:, 1] = r_accel * np.sin(theta_accel)
+        accel['accel'][:, 2] = (np.abs(accel['accel'][:, :2]).sum(axis=1) + 0.02) * REFERENCE_RATE
+        accel['accel'][:, :2] *= REFERENCE_RATE ** 2
+
+        self.vbo_orig = context.buffer(state.view(np.ubyte))
+        self.vbo_state = [context.buffer(reserve=state.nbytes),
+                          context.buffer(reserve=state.nbytes)]
+        self.vbo_accel = context.buffer(accel.view(np.ubyte))
+        self.vbo_color = context.buffer(color_size.view(np.ubyte))
+        # one transform & render VAO per state buffer
+        self.vao_trans = [context.vertex_array(shader.transform,
+                                               [(vbo, '4f 4f', 'in_pos_alpha', 'in_velocity'),
+                                                (self.vbo_accel, '4f', 'accel')])
+                          for vbo in self.vbo_state]
+        self.vao_render = [context.vertex_array(shader.render,
+                                                [(vbo, '4f 16x', 'vertices_alpha'),
+                                                 (self.vbo_color, '4f', 'color_size')])
+                           for vbo in self.vbo_state]
+        self.current = 0
+
+    def busy(self):
+        return self.owner is not None and self.owner.visible
+
+    def reset(self, context):
+        context.copy_buffer(self.vbo_state[0], self.vbo_orig)  # dest, src
+        self.current = 0
+
+
+def _claim(burst):
+    key = (id(burst.context), id(burst.shader), burst.num_particles, burst.radius)
+    sets = _pool.setdefault(key, [])
+    for pset in sets:
+        if pset.owner is burst or not pset.busy():
+            break
+    else:
+        pset = _ParticleSet(burst.context, burst.shader, burst.num_particles, burst.radius)
+        sets.append(pset)
+    pset.owner = burst
+    return pset
+
+
+class ParticleBurst2D(Drawable2D):
+    # make sure to set scale in the init, else the initial particle positiions will
+    # be pretty wild...
+
+    # The simulation runs on the GPU ("transform feedback"), stepping by the
+    # actual time between draws (from `clock`), so it looks the same regardless
+    # of the refresh rate. See _ParticleSet for the buffers.
+    duration = 1 / (0.012 * REFERENCE_RATE)  # seconds
+
+    def __init__(self, context: mgl.Context, shader,
+                 num_particles=1e5, clock=default_timer, *args, **kwargs):
+        super().__init__(context, shader, *args, **kwargs)
+        self.num_particles = int(num_particles)
+        self.radius = float(self.scale[1]) * 0.2
+        self.clock = clock
+        self._particles = None
+        self._elapsed = 0
+        self._last_time = None
         context.point_size = 2.0  # TODO: set point size as intended
 
     def draw(self, camera: Camera):
         if self.visible:
-            self._tracker -= 0.012  # at some point, change to invisible so we don't do excess work
-            if self._tracker < 0:
+            if self._particles is None or self._particles.owner is not self:
+                self.reset()  # never reset, or another burst took over our buffers
+            now = self.clock()
+            dt = 0 if self._last_time is None else now - self._last_time
+            self._last_time = now
+            self._elapsed += dt
+            if self._elapsed > self.duration:
+                # change to invisible so we don't do excess work
                 self.visible = False
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader.render['mvp'].write(self._mvp_ubyte_view)
-            # update particles
-            self.vao_trans.transform(self.vbo_trans, mgl.POINTS)
-            # copy transformed data
-            self.context.copy_buffer(self.vbo_render, self.vbo_trans)
+                return
+            self.update_model(camera, self.shader.render)
+            particles = self._particles
+            cur = particles.current
+            if dt > 0:
+                # update particles (read one state buffer, write the other)
+                self.shader.transform['dt'].value = dt
+                particles.vao_trans[cur].transform(particles.vbo_state[1 - cur], mgl.POINTS)
+                cur = particles.current = 1 - cur
             # draw
-            self.vao_render.render(mgl.POINTS)
+            particles.vao_render[cur].render(mgl.POINTS)
 
     def reset(self):
         # TODO: to get a non-totally-repeating effect, rotate the particles by n degrees
-        self.context.copy_buffer(self.vbo_render, self.vbo_orig)  # dest, src
-        self._tracker = 1.0
+        self._particles = _claim(self)
+        self._particles.reset(self.context)
+        self._elapsed = 0
+        self._last_time = None
@@ -1,7 +1,8 @@
 #version 330
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 in vec3 vertices;
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
 }
\ No newline at end of file
@@ -1,10 +1,11 @@
 #version 330
-uniform mat4 mvp; // depends on screen dims
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 in vec3 vertices;
 in vec2 texcoord;
 out vec2 v_texcoord;
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
     v_texcoord = texcoord;
 }
\ No newline at end of file
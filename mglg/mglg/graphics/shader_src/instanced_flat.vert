@@ -0,0 +1,15 @@
+#version 330
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+in vec3 vertices;
+// per instance
+in mat4 model;
+in vec4 color;
+in float enabled; // 0 if hidden (or not filled/outlined)
+out vec4 v_color;
+void main()
+{
+    gl_Position = vp * model * vec4(vertices, 1.0);
+    if (enabled < 0.5)
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0); // outside the clip volume, so nothing is drawn
+    v_color = color;
+}
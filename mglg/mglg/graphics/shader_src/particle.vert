@@ -1,6 +1,7 @@
 #version 330
 
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 
 in vec4 vertices_alpha;
 in vec4 color_size;
@@ -10,7 +11,7 @@ out vec4 color;
 void main()
 {
     color = vec4(color_size.xyz, vertices_alpha.w);
-    gl_Position = mvp * vec4(vertices_alpha.xyz, 1.0);
+    gl_Position = vp * model * vec4(vertices_alpha.xyz, 1.0);
     gl_PointSize = color_size.w;
 }
 
@@ -1,22 +1,18 @@
 #version 330
 
+uniform float dt; // seconds since the last step
+
 in vec4 in_pos_alpha;
-in vec4 in_prev_pos_alpha;
-in vec4 accel;
+in vec4 in_velocity;
+in vec4 accel; // xy is acceleration, z is the alpha fade rate
 out vec4 out_pos_alpha;
-out vec4 out_prev_pos_alpha;
-
-float accel_to_alpha(vec2 accel)
-{
-    vec2 abs_accel = abs(accel);
-    float mag = abs_accel.x + abs_accel.y;
-    return mag + 0.02;
-}
+out vec4 out_velocity;
 
 void main()
 {
-    out_pos_alpha.xy = in_pos_alpha.xy * 2.0 - in_prev_pos_alpha.xy + accel.xy;
+    // exact for constant acceleration, so the step size doesn't matter
+    out_pos_alpha.xy = in_pos_alpha.xy + (in_velocity.xy + 0.5 * accel.xy * dt) * dt;
     out_pos_alpha.z = 0; // fix this axis
-    out_pos_alpha.w = in_pos_alpha.w - accel_to_alpha(accel.xy); // fade out particle
-    out_prev_pos_alpha = in_pos_alpha;
-}
+    out_pos_alpha.w = in_pos_alpha.w - accel.z * dt; // fade out particle
+    out_velocity = vec4(in_velocity.xy + accel.xy * dt, 0.0, 0.0);
+}
\ No newline at end of file
@@ -0,0 +1,30 @@
+#version 330
+#define TAU 6.283185307179586
+uniform float radius; // middle of the band
+uniform float thickness;
+uniform vec2 angles; // start & stop, radians (CCW from +x)
+uniform float divider; // radians from the start
+uniform float divider_width; // radians
+uniform vec4 left_color; // between start & divider
+uniform vec4 right_color; // between divider & stop
+uniform vec4 divider_color;
+in vec2 local;
+out vec4 f_color;
+void main()
+{
+    float r = length(local);
+    float aa = fwidth(r); // ~one pixel, whatever the scale/resolution
+    // signed distances (negative inside) to the ring, and to the ends of the arc
+    float d_ring = abs(r - radius) - 0.5 * thickness;
+    float theta = angles.x + mod(atan(local.y, local.x) - angles.x, TAU); // [start, start + TAU)
+    float d_ends = theta <= angles.y ?
+        -min(theta - angles.x, angles.y - theta) * r :
+        min(theta - angles.y, angles.x + TAU - theta) * r;
+    float d = max(d_ring, d_ends);
+    // which side of the divider (as arc length)
+    float s = (theta - angles.x - divider) * r;
+    vec4 color = s < 0.0 ? left_color : right_color;
+    float half_div = 0.5 * divider_width * r;
+    color = mix(color, divider_color, 1.0 - smoothstep(half_div - aa, half_div + aa, abs(s)));
+    f_color = vec4(color.rgb, color.a * (1.0 - smoothstep(-aa, aa, d)));
+}
@@ -0,0 +1,11 @@
+#version 330
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
+uniform float extent; // half-width of the quad (outer radius + a bit)
+in vec2 vertices; // unit quad, [-1, 1]
+out vec2 local;
+void main()
+{
+    local = vertices * extent;
+    gl_Position = vp * model * vec4(local, 0.0, 1.0);
+}
@@ -9,11 +9,12 @@ void main()
 
 flat_vert = """
 #version 330
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 in vec3 vertices;
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
 }
 """
 
@@ -32,13 +33,14 @@ void main()
 
 image_vert = """
 #version 330
-uniform mat4 mvp; // depends on screen dims
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 in vec3 vertices;
 in vec2 texcoord;
 out vec2 v_texcoord;
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
     v_texcoord = texcoord;
 }
 """
@@ -46,25 +48,21 @@ void main()
 particle_transform_vert = """
 #version 330
 
+uniform float dt; // seconds since the last step
+
 in vec4 in_pos_alpha;
-in vec4 in_prev_pos_alpha;
-in vec4 accel;
+in vec4 in_velocity;
+in vec4 accel; // xy is acceleration, z is the alpha fade rate
 out vec4 out_pos_alpha;
-out vec4 out_prev_pos_alpha;
-
-float accel_to_alpha(vec2 accel)
-{
-    vec2 abs_accel = abs(accel);
-    float mag = abs_accel.x + abs_accel.y;
-    return mag + 0.02;
-}
+out vec4 out_velocity;
 
 void main()
 {
-    out_pos_alpha.xy = in_pos_alpha.xy * 2.0 - in_prev_pos_alpha.xy + accel.xy;
+    // exact for constant acceleration, so the step size doesn't matter
+    out_pos_alpha.xy = in_pos_alpha.xy + (in_velocity.xy + 0.5 * accel.xy * dt) * dt;
     out_pos_alpha.z = 0; // fix this axis
-    out_pos_alpha.w = in_pos_alpha.w - accel_to_alpha(accel.xy); // fade out particle
-    out_prev_pos_alpha = in_pos_alpha;
+    out_pos_alpha.w = in_pos_alpha.w - accel.z * dt; // fade out particle
+    out_velocity = vec4(in_velocity.xy + accel.xy * dt, 0.0, 0.0);
 }
 
 
@@ -85,7 +83,8 @@ void main()
 particle_vert = """
 #version 330
 
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 
 in vec4 vertices_alpha;
 in vec4 color_size;
@@ -95,7 +94,7 @@ out vec4 color;
 void main()
 {
     color = vec4(color_size.xyz, vertices_alpha.w);
-    gl_Position = mvp * vec4(vertices_alpha.xyz, 1.0);
+    gl_Position = vp * model * vec4(vertices_alpha.xyz, 1.0);
     gl_PointSize = color_size.w;
 }
 
@@ -139,11 +138,12 @@ layout (location = 0) in vec3 vertices;
 flat out vec3 start_pos;
 out vec3 vert_pos;
 
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 
 void main()
 {
-    vec4 pos    = mvp * vec4(vertices, 1.0);
+    vec4 pos    = vp * model * vec4(vertices, 1.0);
     gl_Position = pos;
     vert_pos     = pos.xyz / pos.w;
     start_pos    = vert_pos;
@@ -164,9 +164,10 @@ out vec4 f_color;
 
 void main()
 {
-    vec4 current = texture2D(atlas_data, v_texcoord);
-    vec4 previous = texture2D(atlas_data, v_texcoord+vec2(-1.0, 0.0)/viewport);
-    vec4 next = texture2D(atlas_data, v_texcoord + vec2(1.0, 0.0)/viewport);
+    vec2 uv = v_texcoord / vec2(textureSize(atlas_data, 0)); // texcoords are in pixels
+    vec4 current = texture2D(atlas_data, uv);
+    vec4 previous = texture2D(atlas_data, uv+vec2(-1.0, 0.0)/viewport);
+    vec4 next = texture2D(atlas_data, uv + vec2(1.0, 0.0)/viewport);
 
     float r = current.r;
     float g = current.g;
@@ -204,7 +205,8 @@ void main()
 
 text_vert = """
 #version 330
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 
 in vec3 vertices;
 in vec2 texcoord;
@@ -215,7 +217,7 @@ out float v_offset;
 
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
     v_texcoord = texcoord;
     v_offset = offset;
 }
@@ -234,13 +236,89 @@ void main()
 
 vertex_color_vert = """
 #version 330
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 in vec3 vertices;
 in vec4 color;
 out vec4 f_color;
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
     f_color = color;
 }
 """
+
+instanced_flat_frag = """
+#version 330
+in vec4 v_color;
+out vec4 f_color;
+void main()
+{
+    f_color = v_color;
+}
+"""
+
+instanced_flat_vert = """
+#version 330
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+in vec3 vertices;
+// per instance
+in mat4 model;
+in vec4 color;
+in float enabled; // 0 if hidden (or not filled/outlined)
+out vec4 v_color;
+void main()
+{
+    gl_Position = vp * model * vec4(vertices, 1.0);
+    if (enabled < 0.5)
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0); // outside the clip volume, so nothing is drawn
+    v_color = color;
+}
+"""
+
+sdf_arc_vert = """
+#version 330
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
+uniform float extent; // half-width of the quad (outer radius + a bit)
+in vec2 vertices; // unit quad, [-1, 1]
+out vec2 local;
+void main()
+{
+    local = vertices * extent;
+    gl_Position = vp * model * vec4(local, 0.0, 1.0);
+}
+"""
+
+sdf_arc_frag = """
+#version 330
+#define TAU 6.283185307179586
+uniform float radius; // middle of the band
+uniform float thickness;
+uniform vec2 angles; // start & stop, radians (CCW from +x)
+uniform float divider; // radians from the start
+uniform float divider_width; // radians
+uniform vec4 left_color; // between start & divider
+uniform vec4 right_color; // between divider & stop
+uniform vec4 divider_color;
+in vec2 local;
+out vec4 f_color;
+void main()
+{
+    float r = length(local);
+    float aa = fwidth(r); // ~one pixel, whatever the scale/resolution
+    // signed distances (negative inside) to the ring, and to the ends of the arc
+    float d_ring = abs(r - radius) - 0.5 * thickness;
+    float theta = angles.x + mod(atan(local.y, local.x) - angles.x, TAU); // [start, start + TAU)
+    float d_ends = theta <= angles.y ?
+        -min(theta - angles.x, angles.y - theta) * r :
+        min(theta - angles.y, angles.x + TAU - theta) * r;
+    float d = max(d_ring, d_ends);
+    // which side of the divider (as arc length)
+    float s = (theta - angles.x - divider) * r;
+    vec4 color = s < 0.0 ? left_color : right_color;
+    float half_div = 0.5 * divider_width * r;
+    color = mix(color, divider_color, 1.0 - smoothstep(half_div - aa, half_div + aa, abs(s)));
+    f_color = vec4(color.rgb, color.a * (1.0 - smoothstep(-aa, aa, d)));
+}
+"""
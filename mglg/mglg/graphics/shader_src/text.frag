@@ -10,9 +10,10 @@ out vec4 f_color;
 
 void main()
 {
-    vec4 current = texture2D(atlas_data, v_texcoord);
-    vec4 previous = texture2D(atlas_data, v_texcoord+vec2(-1.0, 0.0)/viewport);
-    vec4 next = texture2D(atlas_data, v_texcoord + vec2(1.0, 0.0)/viewport);
+    vec2 uv = v_texcoord / vec2(textureSize(atlas_data, 0)); // texcoords are in pixels
+    vec4 current = texture2D(atlas_data, uv);
+    vec4 previous = texture2D(atlas_data, uv+vec2(-1.0, 0.0)/viewport);
+    vec4 next = texture2D(atlas_data, uv + vec2(1.0, 0.0)/viewport);
 
     float r = current.r;
     float g = current.g;
@@ -1,5 +1,6 @@
 #version 330
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 
 in vec3 vertices;
 in vec2 texcoord;
@@ -10,7 +11,7 @@ out float v_offset;
 
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
     v_texcoord = texcoord;
     v_offset = offset;
 }
\ No newline at end of file
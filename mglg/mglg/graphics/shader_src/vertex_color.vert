@@ -1,10 +1,11 @@
 #version 330
-uniform mat4 mvp;
+layout(std140) uniform Camera { mat4 vp; }; // shared, see Camera
+uniform mat4 model;
 in vec3 vertices;
 in vec4 color;
 out vec4 f_color;
 void main()
 {
-    gl_Position = mvp * vec4(vertices, 1.0);
+    gl_Position = vp * model * vec4(vertices, 1.0);
     f_color = color;
 }
\ No newline at end of file
@@ -5,67 +5,104 @@ except ImportError:
     import importlib_resources as res
 import moderngl as mgl
 from . import shader_src
+from . import camera
+from .camera import CAMERA_BINDING
 from .shader_src.src import *
-flat_shader = None
-image_shader = None
-stipple_shader = None
-text_shader = None
-vertex_color_shader = None
-particle_shader = None
+
+# Compiled programs, per context: {(id(context), name): (context, program)}
+# (contexts aren't hashable, and keeping the context around means a re-used id
+# can't hand out a program from a context that's gone)
+# There's no program binary API in moderngl, so we lean on the driver's own
+# shader cache for skipping compiles across runs.
+_programs = {}
+
+
+def get_program(context, name, build):
+    key = id(context), name
+    entry = _programs.get(key)
+    if entry is None or entry[0] is not context:
+        entry = _programs[key] = (context, build(context))
+    return entry[1]
+
+
+# other per-context caches (e.g. shape VAOs, font textures) register a callback
+# with on_forget_context, so they're dropped along with the programs
+_forget_callbacks = []
+
+
+def on_forget_context(callback):
+    # `callback(context)` is called by forget_context
+    _forget_callbacks.append(callback)
+    return callback
+
+
+def forget_context(context):
+    # drop the programs (& camera buffers, shape VAOs, ...) for a context that's
+    # about to be released (e.g. an offscreen one). Call while it's still current,
+    # as the buffers & VAOs are released here
+    for key in [k for k, v in _programs.items() if v[0] is context]:
+        del _programs[key]
+    camera.forget_context(context)
+    for callback in _forget_callbacks:
+        callback(context)
+
+
+def _simple(context, name, vert, frag):
+    return get_program(context, name,
+                       lambda ctx: camera_program(ctx, vertex_shader=vert, fragment_shader=frag))
+
+
+def camera_program(context, **kwargs):
+    # program whose `Camera` block (if any) reads from the shared camera buffer
+    prog = context.program(**kwargs)
+    block = prog.get('Camera', None)
+    if block is not None:
+        block.binding = CAMERA_BINDING
+    return prog
 
 
 def make_simple_program(context, v_file, f_file):
     vert = res.read_text(shader_src, v_file)
     frag = res.read_text(shader_src, f_file)
-    return context.program(vertex_shader=vert, fragment_shader=frag)
+    return camera_program(context, vertex_shader=vert, fragment_shader=frag)
 
 
 def FlatShader(context: mgl.Context):
-    global flat_shader
-    if flat_shader is None:
-        flat_shader = context.program(vertex_shader=flat_vert, fragment_shader=flat_frag)
-    return flat_shader
+    return _simple(context, 'flat', flat_vert, flat_frag)
 
 
 def ImageShader(context: mgl.Context):
-    global image_shader
-    if image_shader is None:
-        image_shader = context.program(vertex_shader=image_vert, fragment_shader=image_frag)
-    return image_shader
+    return _simple(context, 'image', image_vert, image_frag)
 
 
 def StippleShader(context: mgl.Context):
-    global stipple_shader
-    if stipple_shader is None:
-        stipple_shader = context.program(vertex_shader=stipple_vert, fragment_shader=stipple_frag)
-    return stipple_shader
+    return _simple(context, 'stipple', stipple_vert, stipple_frag)
 
 
 def TextShader(context: mgl.Context):
-    global text_shader
-    if text_shader is None:
-        text_shader = context.program(vertex_shader=text_vert, fragment_shader=text_frag)
-    return text_shader
+    return _simple(context, 'text', text_vert, text_frag)
 
 
 def VertexColorShader(context: mgl.Context):
-    global vertex_color_shader
-    if vertex_color_shader is None:
-        vertex_color_shader = context.program(vertex_shader=vertex_color_vert, fragment_shader=vertex_color_frag)
-    return vertex_color_shader
+    return _simple(context, 'vertex_color', vertex_color_vert, vertex_color_frag)
+
+
+def InstancedFlatShader(context: mgl.Context):
+    return _simple(context, 'instanced_flat', instanced_flat_vert, instanced_flat_frag)
+
+
+def SdfArcShader(context: mgl.Context):
+    return _simple(context, 'sdf_arc', sdf_arc_vert, sdf_arc_frag)
 
 
 class _ParticleShader(object):
     def __init__(self, context: mgl.Context):
-        self.render = context.program(vertex_shader=particle_vert, fragment_shader=particle_frag)
+        self.render = camera_program(context, vertex_shader=particle_vert, fragment_shader=particle_frag)
         #trans_prog = res.read_text(shader_src, 'particle_transform.vert')
         self.transform = context.program(vertex_shader=particle_transform_vert,
                                          varyings=['out_pos_alpha',
-                                                   'out_prev_pos_alpha'])
+                                                   'out_velocity'])
 
 
 def ParticleShader(context: mgl.Context):
-    global particle_shader
-    if particle_shader is None:
-        particle_shader = _ParticleShader(context)
-    return particle_shader
+    return get_program(context, 'particle', _ParticleShader)
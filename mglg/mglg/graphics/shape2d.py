@@ -1,30 +1,45 @@
 import numpy as np
 
 import moderngl as mgl
-from mglg.ext import earcut, flatten
 from mglg.graphics.camera import Camera
 from mglg.graphics.drawable import Drawable2D
+from mglg.graphics.shaders import on_forget_context
+from mglg.graphics.triangulation import outline_key, triangulate
 from mglg.math.vector import Vector4f
 
 
-def _make_2d_indexed(outline):
-    outline = np.array(outline, dtype=np.float32)
-    tmp = flatten(outline.reshape(1, -1, 2))
-    indices = np.array(earcut(tmp['vertices'], tmp['holes'], tmp['dimensions']), dtype=np.uint32)
+def _make_2d_vertices(outline):
+    outline = np.array(outline, dtype=np.float32).reshape(-1, 2)
     vertices = np.zeros(outline.shape[0], dtype=[('vertices', np.float32, 3)])
     vertices['vertices'][:, :2] = outline
-    return vertices.view(np.ubyte), indices.view(np.ubyte)
+    return vertices.view(np.ubyte)
+
+
+def _make_2d_indexed(outline):
+    # triangulations are cached (see mglg.graphics.triangulation)
+    indices = triangulate(outline)
+    return _make_2d_vertices(outline), indices.view(np.ubyte)
 
 
 white = (1, 1, 1, 1)
 
+# buffers & VAOs for `_static` classes, per context (see mglg.graphics.shaders):
+# {(id(context), cls): (context, vbo, ibo)}
+_static_buffers = {}
+# {(id(context), id(shader), cls): (context, shader, vao_fill, vao_outline)}
+_static_vaos = {}
+
 # 2d shapes using indexed triangles
 
 
 class Shape2D(Drawable2D):
     _vertices = None
     _indices = None
-    _static = False  # user can subclass with `_static = True` to re-use VAO for all class instances
+    _static = False  # user can subclass with `_static = True` to re-use VAO for all class instances (per context)
+    # otherwise, shapes with identical outlines (e.g. repeated Polygon(segments=k)) share VAOs
+    # as {(context id, shader id, outline key): (context, shader, vao_fill, vao_outline, vbo, ibo)}
+    # (keeping the context & shader, so re-used ids aren't mistaken for them)
+    _shared = {}
 
     def __init__(self, context, shader,
                  vertices=None,
@@ -35,23 +50,34 @@ class Shape2D(Drawable2D):
         # kwargs should be position/ori/scale
         super().__init__(context, shader, *args, **kwargs)
 
-        if not hasattr(self, 'vao_fill'):
+        if self._static:
+            self.vao_fill, self.vao_outline = self.static_vaos(context, shader)
+        elif not hasattr(self, 'vao_fill'):
+            key = None
             if self._vertices is None:
-                vertices, indices = _make_2d_indexed(vertices)
+                vertices = np.array(vertices, dtype=np.float32).reshape(-1, 2)
+                key = (id(context), id(shader), outline_key(vertices))
+
+            entry = Shape2D._shared.get(key)
+            if entry is not None and entry[0] is context and entry[1] is shader:
+                self.vao_fill, self.vao_outline = entry[2:4]
             else:
-                vertices, indices = self._vertices, self._indices
+                if self._vertices is None:
+                    vertices, indices = _make_2d_indexed(vertices)
+                else:
+                    vertices, indices = self._vertices, self._indices
 
-            vbo = context.buffer(vertices.view(np.ubyte))
-            ibo = context.buffer(indices.view(np.ubyte))
+                vbo = context.buffer(vertices.view(np.ubyte))
+                ibo = context.buffer(indices.view(np.ubyte))
 
-            if not self._static:
                 # TODO: any way to drop the indexing for the outline? seems silly
                 # to have two
                 self.vao_fill = context.simple_vertex_array(shader, vbo, 'vertices',
                                                             index_buffer=ibo)
                 self.vao_outline = context.simple_vertex_array(shader, vbo, 'vertices')
-            else:
-                self.store_vaos(context, shader, vbo, ibo)
+                if key is not None:
+                    Shape2D._shared[key] = (context, shader, self.vao_fill, self.vao_outline,
+                                            vbo, ibo)
 
         self.is_filled = is_filled
         self.is_outlined = is_outlined
@@ -60,8 +86,7 @@ class Shape2D(Drawable2D):
 
     def draw(self, camera: Camera):
         if self.visible:
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             if self.is_filled:
                 self.shader['color'].write(self.fill_color._ubyte_view)
                 self.vao_fill.render(mgl.TRIANGLES)
@@ -92,11 +117,40 @@ class Shape2D(Drawable2D):
             self._outline_color[:] = color
 
     @classmethod
-    def store_vaos(cls, context, shader, vbo, ibo):
-        # for common shapes, re-use the same VAO
-        cls.vao_fill = context.simple_vertex_array(shader, vbo, 'vertices',
-                                                   index_buffer=ibo)
-        cls.vao_outline = context.simple_vertex_array(shader, vbo, 'vertices')
+    def static_buffers(cls, context):
+        # vertex & index buffers of a `_static` class on `context`
+        # (shared with other programs, e.g. ShapeBatch)
+        key = id(context), cls
+        entry = _static_buffers.get(key)
+        if entry is None or entry[0] is not context:
+            entry = _static_buffers[key] = (context,
+                                            context.buffer(cls._vertices.view(np.ubyte)),
+                                            context.buffer(cls._indices.view(np.ubyte)))
+        return entry[1], entry[2]
+
+    @classmethod
+    def static_vaos(cls, context, shader):
+        # for common shapes, re-use the same VAOs (one pair per context & shader)
+        key = id(context), id(shader), cls
+        entry = _static_vaos.get(key)
+        if entry is None or entry[0] is not context or entry[1] is not shader:
+            vbo, ibo = cls.static_buffers(context)
+            entry = _static_vaos[key] = (context, shader,
+                                         context.simple_vertex_array(shader, vbo, 'vertices',
+                                                                     index_buffer=ibo),
+                                         context.simple_vertex_array(shader, vbo, 'vertices'))
+        return entry[2], entry[3]
+
+
+@on_forget_context
+def forget_context(context):
+    # release the shared buffers & VAOs of a context that's about to be released
+    # (see mglg.graphics.shaders.forget_context)
+    # (registry, where the GL objects start in its entries)
+    for registry, first in ((_static_vaos, 2), (_static_buffers, 1), (Shape2D._shared, 2)):
+        for key in [k for k, v in registry.items() if v[0] is context]:
+            for obj in registry.pop(key)[first:]:
+                obj.release()
 
 
 square_vertices = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) * 0.5
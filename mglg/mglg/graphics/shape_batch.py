@@ -0,0 +1,166 @@
+import numpy as np
+
+import moderngl as mgl
+from mglg.graphics.camera import Camera
+from mglg.graphics.drawable import DrawableGroup
+from mglg.graphics.shaders import InstancedFlatShader
+from mglg.graphics.shape2d import Shape2D
+
+# per-instance data for a run of shapes
+instance_dtype = np.dtype([('model', np.float32, (4, 4)),
+                           ('fill_color', np.float32, 4),
+                           ('outline_color', np.float32, 4),
+                           ('enabled', np.float32, 2)])  # (fill, outline)
+# same buffer, two views (fill pass & outline pass)
+_fill_format = '16f 4f 16x 1f 4x/i'
+_outline_format = '16f 16x 4f 4x 1f/i'
+
+
+def _can_batch(obj):
+    # _static shapes share one vertex/index buffer per class (& context)
+    return isinstance(obj, Shape2D) and obj._static
+
+
+class _Run(object):
+    # consecutive shapes of the same class, drawn with one instanced call per pass
+    def __init__(self, context, shader, shapes):
+        self.shapes = shapes
+        self.data = np.zeros(len(shapes), dtype=instance_dtype)
+        self.state = [None] * len(shapes)
+        self.any_filled, self.any_outlined = True, True
+        vbo, ibo = type(shapes[0]).static_buffers(context)
+        self.buffer = context.buffer(reserve=self.data.nbytes, dynamic=True)
+        self.vao_fill = context.vertex_array(shader,
+                                             [(vbo, '3f', 'vertices'),
+                                              (self.buffer, _fill_format, 'model', 'color', 'enabled')],
+                                             index_buffer=ibo)
+        self.vao_outline = context.vertex_array(shader,
+                                                [(vbo, '3f', 'vertices'),
+                                                 (self.buffer, _outline_format, 'model', 'color', 'enabled')])
+
+    def update(self):
+        # only re-upload the instances that changed (as one contiguous range)
+        data = self.data
+        lo, hi = None, None
+        for i, obj in enumerate(self.shapes):
+            mm = obj.model_matrix  # cached unless it moved
+            fill, outline = obj.fill_color, obj.outline_color
+            state = (obj.mm_version, fill.tobytes(), outline.tobytes(),
+                     obj.visible, obj.is_filled, obj.is_outlined)
+            if state != self.state[i]:
+                self.state[i] = state
+                data['model'][i] = mm
+                data['fill_color'][i] = fill
+                data['outline_color'][i] = outline
+                data['enabled'][i] = (obj.visible and obj.is_filled, obj.visible and obj.is_outlined)
+                if lo is None:
+                    lo = i
+                hi = i
+        if lo is not None:
+            size = data.itemsize
+            self.buffer.write(data[lo:hi + 1].view(np.ubyte), offset=lo * size)
+            # skip passes that wouldn't draw anything (e.g. no outlines at all)
+            self.any_filled, self.any_outlined = data['enabled'].any(axis=0)
+
+    def draw(self):
+        self.update()
+        n = len(self.shapes)
+        if self.any_filled:
+            self.vao_fill.render(mgl.TRIANGLES, instances=n)
+        if self.any_outlined:
+            self.vao_outline.render(mgl.LINE_LOOP, instances=n)
+
+
+class ShapeBatch(DrawableGroup):
+    # DrawableGroup that draws consecutive runs of `_static` shapes of the same class
+    # (Square, Circle, Cross, Arrow) with one instanced draw per pass, rather than
+    # a couple uniform writes + draw calls per shape. Anything else is drawn as usual.
+    # Differences from DrawableGroup:
+    # - within a run, all fills are drawn before all outlines
+    # - shapes keep their own shader, but the batch ignores it (it's always flat)
+    def __init__(self, context, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.context = context
+        self.shader = InstancedFlatShader(context)
+        self._members = None  # ids of the objects the runs were built from
+        self._parts = []
+
+    def _build(self):
+        parts = []
+        run = []
+        for obj in self:
+            if run and not (_can_batch(obj) and type(obj) is type(run[0])):
+                parts.append(_Run(self.context, self.shader, run) if len(run) > 1 else run[0])
+                run = []
+            if _can_batch(obj):
+                run.append(obj)
+            else:
+                parts.append(obj)
+        if run:
+            parts.append(_Run(self.context, self.shader, run) if len(run) > 1 else run[0])
+        # release old instance buffers
+        for part in self._parts:
+            if isinstance(part, _Run):
+                part.vao_fill.release()
+                part.vao_outline.release()
+                part.buffer.release()
+        self._parts = parts
+
+    def draw(self, camera: Camera):
+        if self.visible:
+            # rebuild runs if the contents of the list changed
+            members = tuple(map(id, self))
+            if members != self._members:
+                self._build()
+                self._members = members
+            camera.use(self.context)
+            for part in self._parts:
+                if isinstance(part, _Run):
+                    part.draw()
+                else:
+                    part.draw(camera)
+
+
+if __name__ == '__main__':
+    # offscreen, so the library doesn't need a window (set MODERNGL_BACKEND=egl
+    # where moderngl supports it, otherwise needs a display)
+    import os
+    from timeit import default_timer
+    from mglg.graphics.shaders import FlatShader
+    from mglg.graphics.shape2d import Circle, Square
+
+    width, height = 1920, 1080
+    settings = {}
+    if 'MODERNGL_BACKEND' in os.environ:
+        settings['backend'] = os.environ['MODERNGL_BACKEND']
+    context = mgl.create_standalone_context(require=330, **settings)
+    fbo = context.simple_framebuffer((width, height), components=4)
+    fbo.use()
+    context.enable(mgl.BLEND)
+    # same projection as the experiment's (height is -0.5 to 0.5)
+    ratio = width / height
+    projection = np.eye(4, dtype=np.float32)
+    projection[0, 0], projection[1, 1] = 2 / ratio, 2
+    cam = Camera(projection=projection)
+
+    prog = FlatShader(context)
+    n = 200
+    circles = [Circle(context, prog, scale=(0.02, 0.02), is_outlined=False,
+                      position=(np.random.uniform(-0.6, 0.6), np.random.uniform(-0.4, 0.4)),
+                      fill_color=(np.random.uniform(), 0.3, 0.8, 1)) for i in range(n)]
+    sqr = Square(context, prog, scale=(0.1, 0.1), fill_color=(0.9, 0.9, 0.2, 1))
+    batch = ShapeBatch(context, circles + [sqr])
+    loose = DrawableGroup(circles + [sqr])
+
+    for name, group in [('DrawableGroup', loose), ('ShapeBatch', batch)]:
+        times = []
+        for i in range(300):
+            sqr.rotation = i
+            t0 = default_timer()
+            group.draw(cam)
+            times.append(default_timer() - t0)
+            context.finish()  # stands in for the flip
+            context.clear()
+        print('%s: %.1f us per frame' % (name, 1e6 * np.median(times)))
+    fbo.release()
+    context.release()
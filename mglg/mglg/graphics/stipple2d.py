@@ -2,13 +2,14 @@ import numpy as np
 
 import moderngl as mgl
 from mglg.graphics.drawable import Drawable2D
-from mglg.graphics.shape2d import _make_2d_indexed
+from mglg.graphics.shape2d import _make_2d_vertices
 from mglg.graphics.shape2d import square_vertices, line_vertices, arrow_vertices, circle_vertices
 from mglg.math.vector import Vector4f
 from mglg.graphics.camera import Camera
 
 
 class Stipple2D(Drawable2D):
+    # outlines only, so no triangulation needed
     def __init__(self, context, shader,
                  width, height, vertices=None,
                  pattern=0xff00, color=(1, 1, 1, 1),
@@ -16,7 +17,7 @@ class Stipple2D(Drawable2D):
         super().__init__(context, shader, *args, **kwargs)
 
         if not hasattr(self, '_vertices'):
-            self._vertices, _ = _make_2d_indexed(vertices)
+            self._vertices = _make_2d_vertices(vertices)
 
         vbo = context.buffer(self._vertices.view(np.ubyte))
         self.vao = context.simple_vertex_array(shader, vbo, 'vertices')
@@ -29,8 +30,7 @@ class Stipple2D(Drawable2D):
 
     def draw(self, camera: Camera):
         if self.visible:
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
             self.shader['color'].write(self.color._ubyte_view)
             self.vao.render(mgl.LINE_LOOP)
 
@@ -47,17 +47,17 @@ class Stipple2D(Drawable2D):
 
 
 class StippleSquare(Stipple2D):
-    _vertices, _ = _make_2d_indexed(square_vertices)
+    _vertices = _make_2d_vertices(square_vertices)
     # TODO: squish vertices kwarg
 
 
 class StippleLine(Stipple2D):
-    _vertices, _ = _make_2d_indexed(line_vertices)
+    _vertices = _make_2d_vertices(line_vertices)
 
 
 class StippleArrow(Stipple2D):
-    _vertices, _ = _make_2d_indexed(arrow_vertices)
+    _vertices = _make_2d_vertices(arrow_vertices)
 
 
 class StippleCircle(Stipple2D):
-    _vertices, _ = _make_2d_indexed(circle_vertices)
+    _vertices = _make_2d_vertices(circle_vertices)
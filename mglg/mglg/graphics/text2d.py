@@ -18,9 +18,6 @@ class Text2D(Drawable2D):
         self.anchor_x = anchor_x
         self.anchor_y = anchor_y
         vertices, indices = self.bake(text, font)
-        manager = FontManager()
-        atlas = manager.atlas_agg
-        self.atlas = context.texture(atlas.shape[0:2], 3, atlas.view(np.ubyte))
         vbo = context.buffer(vertices.view(np.ubyte))
         ibo = context.buffer(indices.view(np.ubyte))
         self.vao = context.vertex_array(shader,
@@ -30,13 +27,13 @@ class Text2D(Drawable2D):
                                         index_buffer=ibo)
 
         shader['viewport'].value = width, height
-        self.atlas.use()
 
     def draw(self, camera: Camera):
         if self.visible:
-            np.dot(self.model_matrix, camera.vp, self.mvp)
-            self.atlas.use()
-            self.shader['mvp'].write(self._mvp_ubyte_view)
+            self.update_model(camera)
+            # one atlas texture shared by all text (only new glyphs get uploaded,
+            # and it's replaced if the atlas grows)
+            FontManager.texture(self.context).use()
             self.shader['color'].write(self.color._ubyte_view)
             self.vao.render(mgl.TRIANGLES)
 
@@ -56,7 +53,7 @@ class Text2D(Drawable2D):
         text_width, text_height = 0, 0
         # text is in pixels,
         # position is defining little boxes that texture will go into
-        # texcoord defines the local texture location (not sure I get the units?)
+        # texcoord defines the local texture location (in atlas pixels)
         # offset is the offset of the texture??
 
         index = 0
@@ -135,3 +132,144 @@ class Text2D(Drawable2D):
             self._color = color
         else:
             self._color[:] = color
+
+
+text_vertex_dtype = np.dtype([('vertices', np.float32, 2),
+                              ('texcoord', np.float32, 2),
+                              ('offset', np.float32)])
+
+
+class DynamicText2D(Text2D):
+    # Text that can be changed after creation (e.g. counters), via `.text`.
+    # The vertex buffer holds up to `capacity` glyphs (grows if needed), layout is
+    # done with numpy over cached glyph metrics, and only the glyphs that actually
+    # changed are re-uploaded.
+    # Unlike Text2D (which stretches each string to span [-0.5, 0.5] vertically),
+    # vertices are in units of the font's line height, so the size doesn't
+    # jump around as the text changes.
+    def __init__(self, context: mgl.Context, shader, width, height,
+                 text, font, color=(1, 1, 1, 1), anchor_x='center',
+                 anchor_y='center', capacity=32, *args, **kwargs):
+        # skip Text2D's init (static buffers)
+        super(Text2D, self).__init__(context, shader, *args, **kwargs)
+        self.color = Vector4f(color)
+        self.anchor_x = anchor_x
+        self.anchor_y = anchor_y
+        self.font = font
+        self._metrics = {}  # charcode: (x offset, y offset, w, h, advance, u0, v0, u1, v1)
+        self._text = None
+        self._count = 0  # glyphs currently in the buffer
+        self._allocate(capacity)
+        shader['viewport'].value = width, height
+        self.text = text
+
+    def _allocate(self, capacity):
+        context = self.context
+        self.capacity = capacity
+        self._vertices = np.zeros((capacity, 4), dtype=text_vertex_dtype)
+        indices = np.arange(capacity, dtype=np.uint32)[:, None] * 4 + \
+            np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+        self.vbo = context.buffer(self._vertices.view(np.ubyte), dynamic=True)
+        self.ibo = context.buffer(indices.view(np.ubyte))
+        self.vao = context.vertex_array(self.shader,
+                                        [(self.vbo, '2f 2f 1f', 'vertices', 'texcoord', 'offset')],
+                                        index_buffer=self.ibo)
+        self._count = 0
+
+    def _glyph_metrics(self, text):
+        metrics = self._metrics
+        for charcode in text:
+            if charcode not in metrics:
+                glyph = self.font[charcode]
+                metrics[charcode] = (glyph.offset[0], glyph.offset[1],
+                                     glyph.shape[0], glyph.shape[1],
+                                     glyph.advance[0]/64.) + tuple(glyph.texcoords)
+        return np.array([metrics[c] for c in text], dtype=np.float64).reshape(-1, 9)
+
+    def layout(self, text):
+        # vertices for `text` as an (n, 4) array (n = number of non-newline characters)
+        font = self.font
+        lines = text.split('\n')
+        out = np.zeros((len(text) - len(lines) + 1, 4), dtype=text_vertex_dtype)
+        start = 0
+        for row, line in enumerate(lines):
+            n = len(line)
+            if n == 0:
+                continue
+            m = self._glyph_metrics(line)
+            # kerning w/ the previous glyph on the same line
+            kerning = np.zeros(n)
+            kerning[1:] = [font[c].get_kerning(p) for p, c in zip(line[:-1], line[1:])]
+            step = m[:, 4] + kerning
+            pen = np.cumsum(step) - step  # pen position before each glyph
+            x0 = pen + m[:, 0] + kerning
+            offset = x0 - np.trunc(x0)
+            x0 = np.trunc(x0)
+            x1 = x0 + m[:, 2]
+            y0 = -row * font.height + m[:, 1]
+            y1 = y0 - m[:, 3]
+            width = pen[-1] + step[-1]
+            if self.anchor_x == 'right':
+                x_shift = round(-width)
+            elif self.anchor_x == 'center':
+                x_shift = round(-width/2.0)
+            else:
+                x_shift = 0
+            x0 += x_shift
+            x1 += x_shift
+            v = out[start:start + n]
+            v['vertices'][:, :, 0] = np.stack((x0, x0, x1, x1), axis=1)
+            v['vertices'][:, :, 1] = np.stack((y0, y1, y1, y0), axis=1)
+            u0, v0, u1, v1 = m[:, 5], m[:, 6], m[:, 7], m[:, 8]
+            v['texcoord'][:, :, 0] = np.stack((u0, u0, u1, u1), axis=1)
+            v['texcoord'][:, :, 1] = np.stack((v0, v1, v1, v0), axis=1)
+            v['offset'] = offset[:, None]
+            start += n
+
+        text_height = (len(lines) - 1) * font.height
+        if self.anchor_y == 'top':
+            dy = -(font.ascender + font.descender)
+        elif self.anchor_y == 'center':
+            dy = (text_height - (font.descender + font.ascender))/2
+        elif self.anchor_y == 'bottom':
+            dy = -font.descender + text_height
+        else:
+            dy = 0
+        out['vertices'][:, :, 1] += round(dy)
+        out['vertices'] /= font.height
+        return out
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        if text == self._text:
+            return
+        self._text = text
+        new = self.layout(text)
+        n = new.shape[0]
+        if n > self.capacity:
+            self.vao.release()
+            self.vbo.release()
+            self.ibo.release()
+            self._allocate(max(n, 2 * self.capacity))
+        # only upload the glyphs that changed
+        old = self._vertices[:n]
+        per_glyph = 4 * text_vertex_dtype.itemsize // 4  # float32s per glyph (4 vertices)
+        changed = np.flatnonzero((old.view(np.float32).reshape(n, per_glyph) !=
+                                  new.view(np.float32).reshape(n, per_glyph)).any(axis=1))
+        if changed.size:
+            lo, hi = changed[0], changed[-1] + 1
+            self._vertices[lo:hi] = new[lo:hi]
+            self.vbo.write(self._vertices[lo:hi].view(np.ubyte),
+                           offset=lo * 4 * text_vertex_dtype.itemsize)
+        self._count = n
+
+    def draw(self, camera: Camera):
+        if self.visible and self._count:
+            self.update_model(camera)
+            FontManager.texture(self.context).use()
+            self.shader['color'].write(self.color._ubyte_view)
+            self.vao.render(mgl.TRIANGLES, vertices=6 * self._count)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+
+import numpy as np
+
+from mglg.ext import earcut, flatten
+from mglg.util.cache import atomic_save, cache_dir
+
+# Triangulations of 2d outlines (indices for filling them with triangles).
+# earcut is pure Python & slow for big outlines (e.g. the 256-point circle), so:
+# - convex outlines are filled with a triangle fan, without asking earcut
+# - everything else is triangulated once, then kept in memory & on disk,
+#   keyed by a hash of the outline
+
+_triangulations = {}  # outline key: indices (uint32)
+
+
+def outline_key(outline):
+    # `outline` is a (n, 2) float32 array
+    outline = np.ascontiguousarray(outline, dtype=np.float32)
+    h = hashlib.sha1(('%i|' % outline.shape[0]).encode('utf-8'))
+    h.update(outline.tobytes())
+    return h.hexdigest()
+
+
+def is_convex(outline):
+    # simple & convex (either winding)? repeated points (e.g. closing the loop) are ignored
+    pts = outline[np.any(outline != np.roll(outline, 1, axis=0), axis=1)]
+    if pts.shape[0] < 3:
+        return False
+    edges = np.roll(pts, -1, axis=0) - pts
+    next_edges = np.roll(edges, -1, axis=0)
+    cross = edges[:, 0] * next_edges[:, 1] - edges[:, 1] * next_edges[:, 0]
+    if not (np.all(cross >= 0) or np.all(cross <= 0)):
+        return False
+    # turning the same way at every corner isn't enough (e.g. a star), it also
+    # needs to go around exactly once
+    turning = np.arctan2(cross, np.sum(edges * next_edges, axis=1)).sum()
+    return abs(abs(turning) - 2 * np.pi) < 1e-3
+
+
+def _fan(n):
+    i = np.arange(1, n - 1, dtype=np.uint32)
+    return np.stack((np.zeros_like(i), i, i + 1), axis=1).ravel()
+
+
+def _earcut(outline):
+    tmp = flatten(outline.reshape(1, -1, 2))
+    return np.array(earcut(tmp['vertices'], tmp['holes'], tmp['dimensions']), dtype=np.uint32)
+
+
+def triangulate(outline):
+    outline = np.ascontiguousarray(outline, dtype=np.float32).reshape(-1, 2)
+    key = outline_key(outline)
+    indices = _triangulations.get(key)
+    if indices is not None:
+        return indices
+    if is_convex(outline):
+        indices = _fan(outline.shape[0])
+    else:
+        try:
+            filename = os.path.join(cache_dir('triangulations'), key + '.npy')
+        except OSError:  # e.g. read-only home, just don't persist
+            filename = None
+        if filename is not None and os.path.exists(filename):
+            try:
+                indices = np.load(filename)
+            except (OSError, ValueError):  # corrupt, redo it
+                pass
+        if indices is None:
+            indices = _earcut(outline)
+            if filename is not None:
+                try:
+                    atomic_save(filename, np.save, indices)
+                except OSError:
+                    pass
+    _triangulations[key] = indices
+    return indices
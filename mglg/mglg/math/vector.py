@@ -4,7 +4,6 @@ from itertools import product
 # Shortcomings/TODO:
 # - Subset of Vector4f *could* be a Vector2/3f, but it currently carries through the 4f
 # - Creating always copies data, should we do a view instead?
-# - I *think* having all swizzle combinations makes things globally slower-- does it matter?
 # - subclass array.array instead? What's lost/gained?
 # - Could ask for assigning to swizzled things in pyglm, e.g. arr.xy = 3, 4
 
@@ -55,6 +54,101 @@ class Value(object):
         instance[self.slc] = value
 
 
+# Swizzles (v.x, v.xy, v.bgr, ...) are resolved lazily: VectorBase carries one
+# _Swizzle per name, which on first use works out the indices for the class
+# it was used on, and installs the resolved accessor on that class (so every
+# later access goes straight to it). Resolved accessors are one of:
+# - _Component: single component, returns a Python scalar
+# - _Slice: contiguous run (either direction), returns a view
+# - _Gather: anything else (e.g. .xwy), returns a copy
+# Single components go through a memoryview of the vector, so there's no
+# numpy scalar involved (falling back to numpy for vectors that are views of
+# other vectors). Multi-component assignment is numpy's own __setitem__
+# (which beats looping over the components in Python, and handles overlap,
+# e.g. v.xyzw = v.wzyx).
+
+class _Component(object):
+    def __init__(self, index):
+        self.index = index
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance._mv[self.index]
+        except AttributeError:  # view of another vector (e.g. v.xy)
+            return instance[self.index]
+
+    def __set__(self, instance, value):
+        try:
+            instance._mv[self.index] = value
+        except (AttributeError, TypeError, ValueError):
+            instance[self.index] = value
+
+
+class _Slice(object):
+    def __init__(self, slc):
+        self.slc = slc
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance[self.slc]
+
+    def __set__(self, instance, value):
+        instance[self.slc] = value
+
+
+class _Gather(object):
+    def __init__(self, indices):
+        self.array = np.array(indices, dtype=np.intp)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance[self.array]
+
+    def __set__(self, instance, value):
+        instance[self.array] = value
+
+
+def resolve_swizzle(name, length):
+    # accessor for `name` on a vector of `length`, or None if it isn't a swizzle
+    for components in ('xyzw', 'rgba'):
+        idx = [components.find(c) for c in name]
+        if all(0 <= i < length for i in idx):
+            break
+    else:
+        return None
+    if len(idx) == 1:
+        return _Component(idx[0])
+    step = idx[1] - idx[0]
+    if step in (1, -1) and all(b - a == step for a, b in zip(idx, idx[1:])):
+        stop = idx[-1] + step
+        return _Slice(slice(idx[0], stop if stop >= 0 else None, step))
+    return _Gather(idx)
+
+
+class _Swizzle(object):
+    def __init__(self, name):
+        self.name = name
+
+    def _resolve(self, owner):
+        accessor = resolve_swizzle(self.name, owner._length)
+        if accessor is None:
+            raise AttributeError("'%s' object has no attribute '%s'" % (owner.__name__, self.name))
+        setattr(owner, self.name, accessor)  # memoise for this class
+        return accessor
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self._resolve(owner).__get__(instance, owner)
+
+    def __set__(self, instance, value):
+        self._resolve(type(instance)).__set__(instance, value)
+
+
 class VectorBase(np.ndarray):
     _xyzw = 'xyzw'
     _rgba = 'rgba'
@@ -63,11 +157,6 @@ class VectorBase(np.ndarray):
         super().__init_subclass__(**kwargs)
         cls._length = length
         cls._dtype = dtype
-        swiz = generate_swiz(cls._xyzw[:length])
-        swiz.update(generate_swiz(cls._rgba[:length]))
-
-        for key in swiz.keys():
-            setattr(cls, key, Value(swiz[key]))
 
     def __new__(cls, input_array=0):
         obj = super(VectorBase, cls).__new__(cls, shape=cls._length,
@@ -75,9 +164,18 @@ class VectorBase(np.ndarray):
                                              offset=0, strides=None, order='C')
         obj[:] = input_array
         obj._ubyte_view = obj.view(np.ubyte)
+        obj._mv = memoryview(obj)  # for swizzles (see above)
         return obj
 
 
+# every possible swizzle name (up to 4 components), resolved per class on first use
+for _components in (VectorBase._xyzw, VectorBase._rgba):
+    for _num in range(1, 5):
+        for _name in product(_components, repeat=_num):
+            _name = ''.join(_name)
+            setattr(VectorBase, _name, _Swizzle(_name))
+
+
 class Vector2f(VectorBase, length=2, dtype=np.float32):
     pass
 
@@ -133,6 +231,54 @@ if __name__ == '__main__':
     timethat('y.xyzw')
     timethat('y.xwy')
 
+    # swizzles used to be generated (& indices worked out) up front for every
+    # class, with a Value descriptor per name. Compare to the lazy ones
+    class OldVectorBase(np.ndarray):
+        def __init_subclass__(cls, length, dtype, **kwargs):
+            super().__init_subclass__(**kwargs)
+            cls._length = length
+            cls._dtype = dtype
+            swiz = generate_swiz('xyzw'[:length])
+            swiz.update(generate_swiz('rgba'[:length]))
+            for key in swiz.keys():
+                setattr(cls, key, Value(swiz[key]))
+
+        def __new__(cls, input_array=0):
+            obj = super(OldVectorBase, cls).__new__(cls, shape=cls._length,
+                                                    dtype=cls._dtype, buffer=None,
+                                                    offset=0, strides=None, order='C')
+            obj[:] = input_array
+            obj._ubyte_view = obj.view(np.ubyte)
+            return obj
+
+    def eager_class():
+        class Eager(OldVectorBase, length=4, dtype=np.float32):
+            pass
+        return Eager
+
+    def lazy_class():
+        class Lazy(VectorBase, length=4, dtype=np.float32):
+            pass
+        return Lazy
+
+    timethat('eager_class()', number=100)
+    timethat('lazy_class()', number=100)
+
+    old = eager_class()([1, 2, 3, 4])
+    tup = (5, 6, 7)
+    timethat('old.x')
+    timethat('old.xyz')
+    timethat('old.xwy')
+    timethat('old.x = 1')
+    timethat('old.xyz = tup')
+    timethat('old.xwy = tup')
+    timethat('y.x = 1')
+    timethat('y.xyz = tup')
+    timethat('y.xwy = tup')
+
+    timethat('x[:] = 1')
+    timethat('y[:] = 1')
+
     #
     timethat('x.view(ubyte)')
     timethat('memoryview(x)')
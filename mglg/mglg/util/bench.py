@@ -7,3 +7,40 @@ import timeit
 def timethat(expr, number=int(1e5), setup='pass', globs=globals()):
     title = expr
     print('{:60} {:8.5f} µs'.format(title, timeit.timeit(expr, number=number, globals=globs, setup=setup)*1000000.0/number))
+
+
+if __name__ == '__main__':
+    # per-frame CPU cost of the matrices for a scene of mostly-static objects
+    # (e.g. lines, buttons), where only a couple things move. Previously, every
+    # object rebuilt its model matrix and multiplied by the camera's vp every draw;
+    # now model matrices are cached, and vp * model happens in the shader
+    import numpy as np
+    from mglg.graphics.camera import Camera
+    from mglg.graphics.drawable import Drawable2D
+    from mglg.graphics.object import make_2d_mm
+
+    class Dummy(Drawable2D):
+        def draw(self, camera):
+            pass
+
+    n_static, n_moving = 20, 2
+    camera = Camera(projection=np.eye(4, dtype=np.float32))
+    objs = [Dummy(None, None, position=(i/10, 0)) for i in range(n_static + n_moving)]
+    moving = objs[n_static:]
+    mm = np.eye(4, dtype=np.float32)
+    mvp = np.eye(4, dtype=np.float32)
+
+    def frame_uncached():
+        for obj in objs:
+            make_2d_mm(obj.position, obj.rotation, obj.scale, mm)
+            np.dot(mm, camera.vp, mvp)
+
+    def frame_cached():
+        for obj in moving:
+            obj.position.y += 0.01
+        for obj in objs:
+            obj.model_matrix
+
+    print('%i objects, %i moving:' % (n_static + n_moving, n_moving))
+    timethat('frame_uncached()', number=int(1e4), globs=globals())
+    timethat('frame_cached()', number=int(1e4), globs=globals())
@@ -0,0 +1,37 @@
+import hashlib
+import os
+import sys
+
+# Where mglg keeps things that are expensive to compute but cheap to load
+# (e.g. rasterised glyphs). Override with the MGLG_CACHE_DIR environment variable.
+
+
+def cache_dir(*subdirs):
+    root = os.environ.get('MGLG_CACHE_DIR', None)
+    if root is None:
+        if sys.platform == 'win32':
+            base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+        else:
+            base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+        root = os.path.join(base, 'mglg')
+    path = os.path.join(root, *subdirs)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_hash(filename):
+    # content hash, so moving/renaming a file doesn't invalidate anything
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def atomic_save(filename, save, *args, **kwargs):
+    # write next to the destination & swap in, so a crash never leaves half a file
+    # (`save` is e.g. np.savez, and is given an open file)
+    tmp_name = filename + '.tmp'
+    with open(tmp_name, 'wb') as f:
+        save(f, *args, **kwargs)
+    os.replace(tmp_name, filename)
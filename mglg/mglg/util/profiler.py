@@ -0,0 +1,178 @@
+from time import perf_counter
+
+import numpy as np
+
+from mglg.graphics.drawable import Drawable, DrawableGroup
+
+# Opt-in per-frame timing.
+# Code is split into named sections (`with profiler.section('name'):`), and
+# each gets CPU time (perf_counter) and, optionally, GPU time from a
+# GL_TIME_ELAPSED query. Drawables are instrumented by swapping in a timed
+# `draw` on every Drawable subclass (& DrawableGroup) while enabled, so when
+# disabled there's nothing extra on the draw path at all.
+#
+# Per frame, each section's time (summed over all the times it ran) goes into
+# a fixed-size ring of frames (`cpu`, `gpu`, in ms). Time queries can't
+# nest, so only the outermost GPU-timed section gets one; GPU times of
+# sections nested inside it are left as NaN. Query results are read a few
+# frames late, so reading them doesn't stall on the GPU.
+
+
+class _NullSection(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+null_section = _NullSection()
+
+
+class _Section(object):
+    def __init__(self, profiler, column, gpu):
+        self.profiler = profiler
+        self.column = column
+        self.gpu = gpu
+
+    def __enter__(self):
+        self.profiler._begin(self.column, self.gpu)
+        return self
+
+    def __exit__(self, *args):
+        self.profiler._end()
+
+
+class Profiler(object):
+    def __init__(self, context=None, size=4096, max_sections=64, gpu_latency=3):
+        self.context = context  # GPU timing needs a context
+        self.size = size
+        self.max_sections = max_sections
+        self.gpu_latency = gpu_latency
+        self.names = []  # column: section name
+        self.cpu = np.zeros((size, max_sections), np.float32)  # ms
+        self.gpu = np.full((size, max_sections), np.nan, np.float32)
+        self.dt = np.zeros(size, np.float32)  # time since the previous frame, ms
+        self.frame = 0  # frames so far
+        self._sections = {}
+        self._row = [0.0] * max_sections
+        self._stack = []  # (column, start time, query) of open sections
+        self._gpu_open = False
+        self._queries = []  # (column, query) started this frame
+        self._pending = []  # (frame, [(column, query), ...]) waiting on the GPU
+        self._free = []  # queries to re-use
+        self._patched = []  # (class, original draw)
+
+    def section(self, name, gpu=False):
+        sec = self._sections.get(name)
+        if sec is None:
+            if len(self.names) >= self.max_sections:
+                return null_section
+            self.names.append(name)
+            gpu = gpu and self.context is not None
+            sec = self._sections[name] = _Section(self, len(self.names) - 1, gpu)
+        return sec
+
+    def _begin(self, column, gpu):
+        query = None
+        if gpu and not self._gpu_open:
+            query = self._free.pop() if self._free else self.context.query(time=True)
+            query.__enter__()
+            self._gpu_open = True
+        self._stack.append((column, perf_counter(), query))
+
+    def _end(self):
+        column, t0, query = self._stack.pop()
+        self._row[column] += perf_counter() - t0
+        if query is not None:
+            query.__exit__(None, None, None)
+            self._gpu_open = False
+            self._queries.append((column, query))
+
+    def frame_end(self, dt):
+        # call once per frame, after the swap
+        i = self.frame % self.size
+        self.cpu[i] = self._row
+        self.cpu[i] *= 1000
+        self.gpu[i] = np.nan
+        self.dt[i] = 1000 * dt
+        self._row = [0.0] * self.max_sections
+        if self._queries:
+            self._pending.append((self.frame, self._queries))
+            self._queries = []
+        self.frame += 1
+        self._collect(self.frame - self.gpu_latency)
+
+    def _collect(self, before):
+        # read back queries from frames older than `before` (blocks if they're not done)
+        while self._pending and self._pending[0][0] < before:
+            frame, queries = self._pending.pop(0)
+            keep = self.frame - frame <= self.size  # hasn't been overwritten yet
+            i = frame % self.size
+            for column, query in queries:
+                if keep:
+                    ms = query.elapsed / 1e6
+                    prev = self.gpu[i, column]
+                    self.gpu[i, column] = ms if np.isnan(prev) else prev + ms
+                self._free.append(query)
+
+    def enable(self):
+        # time every drawable's draw (GPU-timed), grouped by class
+        if self._patched:
+            return self
+        classes = [DrawableGroup]
+        stack = [Drawable]
+        while stack:
+            cls = stack.pop()
+            stack.extend(cls.__subclasses__())
+            if 'draw' in cls.__dict__ and not getattr(cls.draw, '__isabstractmethod__', False):
+                classes.append(cls)
+        for cls in classes:
+            original = cls.__dict__['draw']
+            cls.draw = self._timed(original, 'draw:' + cls.__name__,
+                                   gpu=cls is not DrawableGroup)
+            self._patched.append((cls, original))
+        return self
+
+    def _timed(self, draw, name, gpu):
+        def timed_draw(obj, *args, **kwargs):
+            with self.section(name, gpu=gpu):
+                return draw(obj, *args, **kwargs)
+        timed_draw.__wrapped__ = draw
+        return timed_draw
+
+    def disable(self):
+        for cls, original in self._patched:
+            cls.draw = original
+        self._patched = []
+        self._collect(self.frame + 1)
+
+    def histograms(self, start=0, bins=None):
+        # per-section histograms (ms) of the frames from `start` on
+        # (only the last `size` frames are still around)
+        self._collect(self.frame)  # waits on any outstanding queries
+        first = max(start, self.frame - self.size)
+        idx = np.arange(first, self.frame) % self.size
+        if bins is None:
+            bins = np.append(np.arange(0, 40.5, 0.5), np.inf)
+        bins = np.asarray(bins, dtype=np.float64)
+
+        def summarize(vals):
+            vals = vals[~np.isnan(vals)]
+            if vals.size == 0:
+                return None
+            counts, _ = np.histogram(vals, bins)
+            p50, p95, p99 = np.percentile(vals, [50, 95, 99])
+            return {'n': int(vals.size), 'median': float(p50), 'p95': float(p95),
+                    'p99': float(p99), 'max': float(vals.max()), 'counts': counts.tolist()}
+
+        sections = {}
+        for column, name in enumerate(self.names):
+            cpu = self.cpu[idx, column]
+            ran = cpu > 0
+            sections[name] = {'cpu': summarize(cpu[ran]),
+                              'gpu': summarize(self.gpu[idx, column][ran])}
+        return {'frames': int(self.frame - start), 'kept': int(idx.size),
+                'bins_ms': [float(b) if np.isfinite(b) else None for b in bins],
+                'dt': summarize(self.dt[idx]),
+                'sections': sections}
@@ -0,0 +1,85 @@
+# BakedPlayer vs toon's Player, on flip times that jitter around the frame grid
+# (like ExpWindow.next_flip), with tracks like BaseDrop's
+import numpy as np
+import pytest
+
+anim = pytest.importorskip('toon.anim')
+
+if True:
+    from toon.anim.interpolators import select
+    from gonogo.utils.baked_player import BakedPlayer
+    from mglg.math.vector import Vector2f, Vector4f
+
+frame_period = 1/60
+t_waiting, t_max = 0.5, 0.8
+fp2 = 2 * frame_period
+
+
+class Sound(object):
+    state = None
+
+
+def tracks():
+    ball_y = anim.Track([(0, 0.4), (t_waiting, 0.4), (t_waiting + t_max, -0.3),
+                         (t_waiting + t_max + 0.1, -0.4)])
+    photo = anim.Track([(0, 1), (fp2, 0), (t_waiting, 1), (t_waiting + fp2, 0)],
+                       interpolator=select)
+    windup = anim.Track([(0, 0.1), (0.2, 0.1/3), (0.4, 0.1)])
+    sound = anim.Track([(0, 'stop'), (t_waiting, 'play')])
+    return ball_y, photo, windup, sound
+
+
+def build(player):
+    objs = dict(position=Vector2f((0, 0)), color=Vector4f((1, 1, 1, 1)),
+                scales=[Vector2f((1, 1)), Vector2f((2, 2))], sound=Sound())
+    ball_y, photo, windup, sound = tracks()
+    player.add(ball_y, 'y', objs['position'])
+    player.add(photo, 'rgb', objs['color'])
+    player.add(windup, 'xy', objs['scales'])
+    player.add(sound, 'state', objs['sound'])
+    return objs
+
+
+def check_same(a, b):
+    for key in ('position', 'color'):
+        np.testing.assert_array_equal(a[key], b[key])
+    for x, y in zip(a['scales'], b['scales']):
+        np.testing.assert_array_equal(x, y)
+    assert a['sound'].state == b['sound'].state
+
+
+@pytest.mark.parametrize('jitter', [0, 50e-6, 0.5e-3, 3e-3])
+def test_advance_uses_nearest_frame(jitter):
+    rng = np.random.default_rng(1)
+    baked = BakedPlayer(frame_period)
+    ours = build(baked)
+    baked.bake()
+    ref = anim.Player()
+    theirs = build(ref)
+    baked.start(0)
+    ref.start(0)
+    k = 0
+    while baked.is_playing:
+        k += 1
+        noise = np.clip(rng.normal(0, jitter), -0.45 * frame_period, 0.45 * frame_period)
+        baked.advance(k * frame_period + noise)
+        ref.advance(k * frame_period)  # the frame that flip lands on
+        check_same(ours, theirs)
+    assert ref.is_stopped
+    assert k == baked.frames - 1
+
+
+def test_seek_is_exact():
+    rng = np.random.default_rng(2)
+    baked = BakedPlayer(frame_period)
+    ours = build(baked)
+    baked.bake()
+    ref = anim.Player()
+    theirs = build(ref)
+    baked.start(10)
+    ref.start(10)
+    for t in np.sort(rng.uniform(10, 10 + baked.duration + 0.1, 50)):
+        baked.seek(t)
+        ref.advance(t)
+        check_same(ours, theirs)
+        assert baked.is_playing == ref.is_playing
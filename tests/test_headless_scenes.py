@@ -0,0 +1,146 @@
+# Smoke test: every scene type runs start to finish on the headless window
+# (virtual clock, so a block takes as long as the GPU needs to draw it).
+# Needs an OpenGL 3.3 standalone context (e.g. MODERNGL_BACKEND=egl, or Xvfb),
+# plus the scenes' own dependencies (imgui, psychtoolbox), and is skipped otherwise.
+import os
+
+import pytest
+
+pytest.importorskip('moderngl')
+pytest.importorskip('imgui')
+pytest.importorskip('psychtoolbox')
+
+if True:  # the headless window has to come first (see gonogo/visuals/headless.py)
+    import numpy as np
+    from gonogo.visuals.headless import HeadlessWindow
+    from toon.input import BaseDevice, Obs, TsArray
+
+    from gonogo.scenes import GoNo, GoNoInstr, Practice, PracticeInstr
+    from gonogo.scenes.done import Done
+    from gonogo.scenes.loading import Loading
+    from gonogo.settings.block_handler import BlockHandler
+    from gonogo.settings.resolve import resolve_settings
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+defaults = os.path.join(root, 'recipes', 'defaults/')
+
+recipe = """
+[1]
+name = 'practice'
+trials = 2
+
+[2]
+name = 'go_no'
+trials = 3
+"""
+
+
+class Keyboard(BaseDevice):
+    # same observations as gonogo.devices.keyboard.Keyboard (& the same name,
+    # which the scenes check), minus pynput
+    class Press(Obs):
+        shape = (1,)
+        ctype = bool
+
+    class Index(Obs):
+        shape = (1,)
+        ctype = int
+
+    sampling_frequency = 10
+
+    def __init__(self, keys, **kwargs):
+        self.keys = keys
+        super(Keyboard, self).__init__(**kwargs)
+
+    def read(self):
+        return None
+
+
+class ScriptedDevice(object):
+    # in-process stand-in for toon's MpDevice: taps the first key every
+    # `period` seconds (of the window's clock)
+    def __init__(self, clock, period=0.4, hold=0.05):
+        self.device = Keyboard(keys=['k', 'l'], clock=clock)
+        self.clock = clock
+        self.period = period
+        self.hold = hold
+        self._last = 0
+
+    def __enter__(self):
+        self.device.__enter__()
+        self._last = self.clock()
+        return self
+
+    def __exit__(self, *args):
+        self.device.__exit__(*args)
+
+    def clear(self):
+        self._last = self.clock()
+
+    def read(self):
+        now = self.clock()
+        start = self._last
+        self._last = now
+        taps = np.arange(np.floor(start / self.period), np.floor(now / self.period) + 1) * self.period
+        times = np.concatenate([taps, taps + self.hold])
+        press = np.concatenate([np.ones(taps.size, bool), np.zeros(taps.size, bool)])
+        keep = (times > start) & (times <= now)
+        if not keep.any():
+            return self.device.Returns()
+        order = np.argsort(times[keep], kind='stable')
+        times = times[keep][order]
+        return self.device.Returns(press=TsArray(press[keep][order].reshape(-1, 1), time=times),
+                                   index=TsArray(np.zeros((times.size, 1), int), time=times))
+
+
+@pytest.fixture(scope='module')
+def win():
+    try:
+        win = HeadlessWindow(width=640, height=360)
+    except Exception as e:  # no (suitable) OpenGL
+        pytest.skip('No standalone OpenGL 3.3 context: %s' % e)
+    yield win
+    win.close()
+
+
+@pytest.fixture
+def session(win, tmp_path):
+    recipe_path = tmp_path / 'smoke.toml'
+    recipe_path.write_text(recipe)
+    blocks, resolved = resolve_settings(str(recipe_path), defaults)
+    handlers = [BlockHandler(x, y) for x, y in zip(blocks, resolved)]
+    user_settings = {'id': 'smoke', 'spanish': 'en', 'device_type': 'keyboard',
+                     'subj_path': str(tmp_path / 'data')}
+    return handlers, user_settings, ScriptedDevice(win.clock)
+
+
+def test_instructions(win, session):
+    handlers, user_settings, device = session
+    for num, (cls, bh) in enumerate(zip([PracticeInstr, GoNoInstr], handlers)):
+        t0 = win.current_time
+        cls(win, bh, device, user_settings, number=num + 1, total=2).run()
+        assert win.current_time - t0 > 3  # nothing can be skipped for the first ~3s
+
+
+def test_blocks(win, session):
+    handlers, user_settings, device = session
+    for cls, bh in zip([Practice, GoNo], handlers):
+        block = cls(win, bh, device, user_settings)
+        block.run()
+        assert bh.counter == bh.trials
+        files = os.listdir(block.block_path)
+        assert 'trace.json' in files
+        assert any(f.startswith('summary_') for f in files)
+
+
+def test_done(win):
+    t0 = win.current_time
+    Done(win).run()
+    assert win.current_time - t0 >= 3
+
+
+def test_loading(win):
+    # the dialog needs a person to fill it in, so just make sure it builds & draws
+    loading = Loading(win, recipe_dir=os.path.join(root, 'recipes/'))
+    loading.loading.draw(win.cam)
+    win.flip()